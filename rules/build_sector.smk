@@ -1018,6 +1018,7 @@ rule prepare_sector_network:
         heat_pump_sources=config_provider("sector", "heat_pump_sources"),
         heat_systems=config_provider("sector", "heat_systems"),
         energy_totals_year=config_provider("energy", "energy_totals_year"),
+        fast_io_cache=resources("fast_io_cache"),
     input:
         unpack(input_profile_offwind),
         **rules.cluster_gas_network.output,
@@ -189,9 +189,11 @@ def sanitize_carriers(n, config):
     Raises a warning if any carrier's "tech_colors" are not defined in the config dictionary.
     """
 
+    carriers = set()
     for c in n.iterate_components():
         if "carrier" in c.df:
-            add_missing_carriers(n, c.df.carrier)
+            carriers.update(c.df.carrier.unique())
+    add_missing_carriers(n, carriers)
 
     carrier_i = n.carriers.index
     nice_names = (
@@ -211,11 +213,17 @@ def sanitize_carriers(n, config):
 
 def sanitize_locations(n):
     if "location" in n.buses.columns:
-        n.buses["x"] = n.buses.x.where(n.buses.x != 0, n.buses.location.map(n.buses.x))
-        n.buses["y"] = n.buses.y.where(n.buses.y != 0, n.buses.location.map(n.buses.y))
+        # attributes of the location bus of every bus, looked up at once
+        location = (
+            n.buses[["x", "y", "country"]]
+            .reindex(n.buses.location)
+            .set_axis(n.buses.index)
+        )
+        n.buses["x"] = n.buses.x.where(n.buses.x != 0, location.x)
+        n.buses["y"] = n.buses.y.where(n.buses.y != 0, location.y)
         n.buses["country"] = n.buses.country.where(
             n.buses.country.ne("") & n.buses.country.notnull(),
-            n.buses.location.map(n.buses.country),
+            location.country,
         )
 
 
@@ -484,9 +484,9 @@ def plot_carbon_budget_distribution(input_eurostat, options):
 
     if snakemake.config["foresight"] == "myopic":
         path_cb = "results/" + snakemake.params.RDIR + "/csvs/"
-        co2_cap = pd.read_csv(path_cb + "carbon_budget_distribution.csv", index_col=0)[
-            ["cb"]
-        ]
+        co2_cap = pd.read_csv(
+            path_cb + "carbon_budget_distribution.csv", index_col=0, comment="#"
+        )
         co2_cap *= e_1990
     else:
         supply_energy = pd.read_csv(
@@ -7,8 +7,12 @@ Adds all sector-coupling components to the network, including demand and supply
 technologies for the buildings, transport and industry sectors.
 """
 
+import hashlib
+import json
 import logging
 import os
+import tempfile
+from functools import lru_cache
 from itertools import product
 from types import SimpleNamespace
 
@@ -24,12 +28,6 @@ from _helpers import (
     update_config_from_wildcards,
 )
 from add_electricity import calculate_annuity, sanitize_carriers, sanitize_locations
-from build_energy_totals import (
-    build_co2_totals,
-    build_eea_co2,
-    build_eurostat,
-    build_eurostat_co2,
-)
 from build_transport_demand import transport_degree_factor
 from definitions.heat_sector import HeatSector
 from definitions.heat_system import HeatSystem
@@ -39,7 +37,6 @@ from networkx.algorithms.connectivity.edge_augmentation import k_edge_augmentati
 from prepare_network import maybe_adjust_costs_and_potentials
 from pypsa.geo import haversine_pts
 from pypsa.io import import_components_from_dataframe
-from scipy.stats import beta
 
 spatial = SimpleNamespace()
 logger = logging.getLogger(__name__)
@@ -252,6 +249,15 @@ def co2_emissions_year(
     """
     Calculate CO2 emissions in one specific year (e.g. 1990 or 2018).
     """
+    # imported here as build_energy_totals pulls in geopandas and
+    # country_converter, which are only needed for carbon budgets
+    from build_energy_totals import (
+        build_co2_totals,
+        build_eea_co2,
+        build_eurostat,
+        build_eurostat_co2,
+    )
+
     eea_co2 = build_eea_co2(input_co2, year, emissions_scope)
 
     eurostat = build_eurostat(input_eurostat, countries)
@@ -272,9 +278,14 @@ def co2_emissions_year(
 
 
 # TODO: move to own rule with sector-opts wildcard?
-def build_carbon_budget(o, input_eurostat, fn, emissions_scope, input_co2, options):
+def build_carbon_budget(
+    o, input_eurostat, fn, emissions_scope, input_co2, options, key=""
+):
     """
     Distribute carbon budget following beta or exponential transition path.
+
+    The distribution is written to ``fn``, preceded by a comment line with
+    ``key``, and returned.
     """
 
     if "be" in o:
@@ -313,6 +324,8 @@ def build_carbon_budget(o, input_eurostat, fn, emissions_scope, input_co2, optio
     t_0 = planning_horizons[0]
 
     if "be" in o:
+        from scipy.stats import beta
+
         # final year in the path
         t_f = t_0 + (2 * carbon_budget / e_0).round(0)
 
@@ -338,7 +351,53 @@ def build_carbon_budget(o, input_eurostat, fn, emissions_scope, input_co2, optio
     csvs_folder = fn.rsplit("/", 1)[0]
     if not os.path.exists(csvs_folder):
         os.makedirs(csvs_folder)
-    co2_cap.to_csv(fn, float_format="%.3f")
+    # written to a temporary file first, concurrent jobs may read the csv
+    fd, tmp = tempfile.mkstemp(dir=csvs_folder, suffix=".csv")
+    os.close(fd)
+    try:
+        with open(tmp, "w") as f:
+            f.write(f"# {key}\n")
+            co2_cap.to_csv(f, float_format="%.3f")
+        os.replace(tmp, fn)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    # rounded as in the csv, so that later horizons reading it use the same values
+    return co2_cap.round(3)
+
+
+def carbon_budget_key(
+    o, emissions_scope, countries, planning_horizons, options, inputs
+):
+    """
+    Hash of everything the carbon budget distribution is derived from.
+    """
+    key = json.dumps(
+        [
+            o,
+            emissions_scope,
+            countries,
+            planning_horizons,
+            determine_emission_sectors(options),
+            [os.path.getmtime(fn) for fn in inputs],
+        ],
+        default=str,
+    )
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def read_carbon_budget(fn, key):
+    """
+    Read the carbon budget distribution from ``fn`` if it was built with
+    ``key``, otherwise return None.
+    """
+    try:
+        with open(fn) as f:
+            if f.readline() != f"# {key}\n":
+                return None
+            return pd.read_csv(f, index_col=0).squeeze()
+    except FileNotFoundError:
+        return None
 
 
 def add_lifetime_wind_solar(n, costs):
@@ -475,95 +534,107 @@ def update_wind_solar_costs(
 def add_carrier_buses(n, carrier, nodes=None):
     """
     Add buses to connect e.g. coal, nuclear and oil plants.
+
+    ``carrier`` may also be a list of carriers, whose buses, stores and
+    generators are then added with one ``n.madd`` per component type.
     """
-    if nodes is None:
-        nodes = vars(spatial)[carrier].nodes
-    location = vars(spatial)[carrier].locations
+    carriers = [carrier] if isinstance(carrier, str) else list(carrier)
 
-    # skip if carrier already exists
-    if carrier in n.carriers.index:
-        return
+    batch = ComponentBatch()
+    new_carriers = []
 
-    if not isinstance(nodes, pd.Index):
-        nodes = pd.Index(nodes)
-
-    n.add("Carrier", carrier)
-
-    unit = "MWh_LHV" if carrier == "gas" else "MWh_th"
-    # preliminary value for non-gas carriers to avoid zeros
-    if carrier == "gas":
-        capital_cost = costs.at["gas storage", "fixed"]
-    elif carrier == "oil":
-        # based on https://www.engineeringtoolbox.com/fuels-higher-calorific-values-d_169.html
-        mwh_per_m3 = 44.9 * 724 * 0.278 * 1e-3  # MJ/kg * kg/m3 * kWh/MJ * MWh/kWh
-        capital_cost = (
-            costs.at["General liquid hydrocarbon storage (product)", "fixed"]
-            / mwh_per_m3
-        )
-    elif carrier == "methanol":
-        # based on https://www.engineeringtoolbox.com/fossil-fuels-energy-content-d_1298.html
-        mwh_per_m3 = 5.54 * 791 * 1e-3  # kWh/kg * kg/m3 * MWh/kWh
-        capital_cost = (
-            costs.at["General liquid hydrocarbon storage (product)", "fixed"]
-            / mwh_per_m3
+    for carrier in carriers:
+        # skip if carrier already exists
+        if carrier in n.carriers.index or carrier in new_carriers:
+            continue
+        new_carriers.append(carrier)
+
+        carrier_nodes = vars(spatial)[carrier].nodes if nodes is None else nodes
+        location = vars(spatial)[carrier].locations
+
+        carrier_nodes = pd.Index(carrier_nodes)
+
+        unit = "MWh_LHV" if carrier == "gas" else "MWh_th"
+        # preliminary value for non-gas carriers to avoid zeros
+        if carrier == "gas":
+            capital_cost = costs.at["gas storage", "fixed"]
+        elif carrier == "oil":
+            # based on https://www.engineeringtoolbox.com/fuels-higher-calorific-values-d_169.html
+            mwh_per_m3 = 44.9 * 724 * 0.278 * 1e-3  # MJ/kg * kg/m3 * kWh/MJ * MWh/kWh
+            capital_cost = (
+                costs.at["General liquid hydrocarbon storage (product)", "fixed"]
+                / mwh_per_m3
+            )
+        elif carrier == "methanol":
+            # based on https://www.engineeringtoolbox.com/fossil-fuels-energy-content-d_1298.html
+            mwh_per_m3 = 5.54 * 791 * 1e-3  # kWh/kg * kg/m3 * MWh/kWh
+            capital_cost = (
+                costs.at["General liquid hydrocarbon storage (product)", "fixed"]
+                / mwh_per_m3
+            )
+        else:
+            capital_cost = 0.1
+
+        batch.madd("Bus", carrier_nodes, location=location, carrier=carrier, unit=unit)
+
+        batch.madd(
+            "Store",
+            carrier_nodes + " Store",
+            bus=carrier_nodes,
+            e_nom_extendable=True,
+            e_cyclic=True,
+            carrier=carrier,
+            capital_cost=capital_cost,
         )
-    else:
-        capital_cost = 0.1
 
-    n.madd("Bus", nodes, location=location, carrier=carrier, unit=unit)
+        fossils = ["coal", "gas", "oil", "lignite", "uranium"]
+        if options.get("fossil_fuels", True) and carrier in fossils:
 
-    n.madd(
-        "Store",
-        nodes + " Store",
-        bus=nodes,
-        e_nom_extendable=True,
-        e_cyclic=True,
-        carrier=carrier,
-        capital_cost=capital_cost,
-    )
+            suffix = ""
 
-    fossils = ["coal", "gas", "oil", "lignite", "uranium"]
-    if options.get("fossil_fuels", True) and carrier in fossils:
+            if carrier == "oil" and cf_industry["oil_refining_emissions"] > 0:
 
-        suffix = ""
+                batch.madd(
+                    "Bus",
+                    carrier_nodes + " primary",
+                    location=location,
+                    carrier=carrier + " primary",
+                    unit=unit,
+                )
 
-        if carrier == "oil" and cf_industry["oil_refining_emissions"] > 0:
+                batch.madd(
+                    "Link",
+                    carrier_nodes + " refining",
+                    bus0=carrier_nodes + " primary",
+                    bus1=carrier_nodes,
+                    bus2="co2 atmosphere",
+                    location=location,
+                    carrier=carrier + " refining",
+                    p_nom=1e6,
+                    efficiency=1
+                    - (
+                        cf_industry["oil_refining_emissions"]
+                        / costs.at[carrier, "CO2 intensity"]
+                    ),
+                    efficiency2=cf_industry["oil_refining_emissions"],
+                )
 
-            n.madd(
-                "Bus",
-                nodes + " primary",
-                location=location,
-                carrier=carrier + " primary",
-                unit=unit,
-            )
+                suffix = " primary"
 
-            n.madd(
-                "Link",
-                nodes + " refining",
-                bus0=nodes + " primary",
-                bus1=nodes,
-                bus2="co2 atmosphere",
-                location=location,
-                carrier=carrier + " refining",
-                p_nom=1e6,
-                efficiency=1
-                - (
-                    cf_industry["oil_refining_emissions"]
-                    / costs.at[carrier, "CO2 intensity"]
-                ),
-                efficiency2=cf_industry["oil_refining_emissions"],
+            batch.madd(
+                "Generator",
+                carrier_nodes + suffix,
+                bus=carrier_nodes + suffix,
+                p_nom_extendable=True,
+                carrier=carrier + suffix,
+                marginal_cost=costs.at[carrier, "fuel"],
             )
 
-            suffix = " primary"
+    if not new_carriers:
+        return
 
-        n.madd(
-            "Generator",
-            nodes + suffix,
-            bus=nodes + suffix,
-            p_nom_extendable=True,
-            carrier=carrier + suffix,
-            marginal_cost=costs.at[carrier, "fuel"],
-        )
+    n.madd("Carrier", new_carriers)
+    batch.apply(n)
 
 
 # TODO: PyPSA-Eur merge issue
@@ -620,7 +691,11 @@ def add_eu_bus(n, x=-5.5, y=46):
 def add_co2_tracking(n, costs, options, emissions_other):
     # minus sign because opposite to how fossil fuels used:
     # CH4 burning puts CH4 down, atmosphere up
-    n.add("Carrier", "co2", co2_emissions=-1.0)
+    n.madd(
+        "Carrier",
+        ["co2", "co2 stored", "co2 sequestered"],
+        co2_emissions=[-1.0, 0.0, 0.0],
+    )
 
     # this tracks CO2 in the atmosphere
     n.add("Bus", "co2 atmosphere", location="EU", carrier="co2", unit="t_co2")
@@ -666,7 +741,6 @@ def add_co2_tracking(n, costs, options, emissions_other):
         e_cyclic=True,
         bus=spatial.co2.nodes,
     )
-    n.add("Carrier", "co2 stored")
 
     # this tracks CO2 sequestered, e.g. underground
     sequestration_buses = pd.Index(spatial.co2.nodes).str.replace(
@@ -721,8 +795,6 @@ def add_co2_tracking(n, costs, options, emissions_other):
         carrier="co2 sequestered",
     )
 
-    n.add("Carrier", "co2 sequestered")
-
     if options["co2_vent"]:
         n.madd(
             "Link",
@@ -1161,6 +1233,38 @@ def cycling_shift(df, steps=1):
     return df
 
 
+def read_csv_cached(path, cache_dir=None):
+    """
+    Read a csv file with the first column as index.
+
+    With a ``cache_dir`` the parsed table is also stored there as parquet,
+    named after a hash of the csv content, so that later workflow runs
+    skip the csv parsing.
+    """
+    if cache_dir is None:
+        return pd.read_csv(path, index_col=0)
+
+    # keyed on the content, so a rebuilt csv never hits a stale copy
+    with open(path, "rb") as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    fn = os.path.join(cache_dir, digest + ".parquet")
+    if os.path.exists(fn):
+        return pd.read_parquet(fn)
+    df = pd.read_csv(path, index_col=0)
+    # write to a temporary file and move it into place, so that concurrent
+    # jobs sharing this input never read a partially written copy
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".parquet")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp)
+        os.replace(tmp, fn)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return df
+
+
 def prepare_costs(cost_file, params, nyears):
     # set all asset costs and other parameters
     costs = pd.read_csv(cost_file, index_col=[0, 1]).sort_index()
@@ -1175,12 +1279,11 @@ def prepare_costs(cost_file, params, nyears):
 
     costs = costs.fillna(params["fill_values"])
 
-    def annuity_factor(v):
-        return calculate_annuity(v["lifetime"], v["discount rate"]) + v["FOM"] / 100
-
-    costs["fixed"] = [
-        annuity_factor(v) * v["investment"] * nyears for i, v in costs.iterrows()
-    ]
+    annuity_factor = (
+        calculate_annuity(costs["lifetime"], costs["discount rate"])
+        + costs["FOM"] / 100
+    )
+    costs["fixed"] = annuity_factor * costs["investment"] * nyears
 
     return costs
 
@@ -2164,6 +2267,14 @@ def add_heat(n: pypsa.Network, costs: pd.DataFrame, cop: xr.DataArray):
         # 1e3 converts from W/m^2 to MW/(1000m^2) = kW/m^2
         solar_thermal = options["solar_cf_correction"] * solar_thermal / 1e3
 
+    # switches read in every iteration of the heat system loop
+    time_dep_hp_cop = options["time_dep_hp_cop"]
+    tes = options["tes"]
+    resistive_heaters = options["resistive_heaters"]
+    boilers = options["boilers"]
+    chp = options["chp"]
+    micro_chp = options["micro_chp"]
+
     for (
         heat_system
     ) in (
@@ -2253,7 +2364,7 @@ def add_heat(n: pypsa.Network, costs: pd.DataFrame, cop: xr.DataArray):
                 )
                 .to_pandas()
                 .reindex(index=n.snapshots)
-                if options["time_dep_hp_cop"]
+                if time_dep_hp_cop
                 else costs.at[costs_name, "efficiency"]
             )
 
@@ -2272,7 +2383,7 @@ def add_heat(n: pypsa.Network, costs: pd.DataFrame, cop: xr.DataArray):
                 lifetime=costs.at[costs_name, "lifetime"],
             )
 
-        if options["tes"]:
+        if tes:
             n.add("Carrier", f"{heat_system} water tanks")
 
             n.madd(
@@ -2323,7 +2434,7 @@ def add_heat(n: pypsa.Network, costs: pd.DataFrame, cop: xr.DataArray):
                 ],
             )
 
-        if options["resistive_heaters"]:
+        if resistive_heaters:
             key = f"{heat_system.central_or_decentral} resistive heater"
 
             n.madd(
@@ -2340,7 +2451,7 @@ def add_heat(n: pypsa.Network, costs: pd.DataFrame, cop: xr.DataArray):
                 lifetime=costs.at[key, "lifetime"],
             )
 
-        if options["boilers"]:
+        if boilers:
             key = f"{heat_system.central_or_decentral} gas boiler"
 
             n.madd(
@@ -2379,7 +2490,7 @@ def add_heat(n: pypsa.Network, costs: pd.DataFrame, cop: xr.DataArray):
                 ],
             )
 
-        if options["chp"] and heat_system == HeatSystem.URBAN_CENTRAL:
+        if chp and heat_system == HeatSystem.URBAN_CENTRAL:
             # add gas CHP; biomass CHP is added in biomass section
             n.madd(
                 "Link",
@@ -2437,11 +2548,7 @@ def add_heat(n: pypsa.Network, costs: pd.DataFrame, cop: xr.DataArray):
                 lifetime=costs.at["central gas CHP", "lifetime"],
             )
 
-        if (
-            options["chp"]
-            and options["micro_chp"]
-            and heat_system.value != "urban central"
-        ):
+        if chp and micro_chp and heat_system.value != "urban central":
             n.madd(
                 "Link",
                 nodes + f" {heat_system} micro gas CHP",
@@ -3251,14 +3358,66 @@ def add_biomass(n, costs):
         )
 
 
-def add_low_t_industry(n, nodes, industrial_demand, costs, must_run):
+class ComponentBatch(list):
+    """
+    Collect ``n.madd`` arguments so that components can be assembled without
+    touching the network and added to it in one go afterwards.
+
+    On :meth:`apply`, all components of the same class which set the same
+    attributes are merged into a single ``n.madd`` call. Buses are added
+    first so that the other components find their buses defined.
+    """
+
+    def madd(self, class_name, names, suffix="", **attrs):
+        self.append((class_name, names, suffix, attrs))
+
+    def apply(self, n):
+        groups = {}
+        for class_name, names, suffix, attrs in self:
+            # resolve suffixes and attribute types in the same way as n.madd
+            names = pd.Index(names).astype(str) + suffix
+            static = {}
+            series = {}
+            for k, v in attrs.items():
+                if isinstance(v, pd.DataFrame):
+                    series[k] = v.rename(columns=lambda i: str(i) + suffix)
+                elif isinstance(v, pd.Series):
+                    static[k] = v.rename(lambda i: str(i) + suffix)
+                elif isinstance(v, np.ndarray) and v.shape == (
+                    len(n.snapshots),
+                    len(names),
+                ):
+                    series[k] = pd.DataFrame(v, index=n.snapshots, columns=names)
+                else:
+                    static[k] = v
+
+            # only merge calls with identical attributes, as n.madd does not
+            # fill missing values with attribute defaults
+            key = (class_name, frozenset(static), frozenset(series))
+            groups.setdefault(key, []).append(
+                (pd.DataFrame(static, index=names), series)
+            )
+
+        for (class_name, _, _), group in sorted(
+            groups.items(), key=lambda item: item[0][0] != "Bus"
+        ):
+            static = pd.concat([df for df, _ in group])
+            series = {
+                k: pd.concat([s[k] for _, s in group], axis=1) for k in group[0][1]
+            }
+            n.madd(class_name, static.index, **static, **series)
+
+
+def build_low_t_industry(nodes, industrial_demand, costs, must_run):
     """
-    Add low temperature heat for industry.
+    Build low temperature heat components for industry.
     """
 
     logger.info("Add low temperature industry.")
 
-    n.madd(
+    batch = ComponentBatch()
+
+    batch.madd(
         "Bus",
         nodes + " lowT industry",
         location=nodes,
@@ -3266,7 +3425,7 @@ def add_low_t_industry(n, nodes, industrial_demand, costs, must_run):
         unit="MWh_LHV",
     )
 
-    n.madd(
+    batch.madd(
         "Load",
         nodes,
         suffix=" lowT industry",
@@ -3279,7 +3438,7 @@ def add_low_t_industry(n, nodes, industrial_demand, costs, must_run):
         options["industry_t"]["low_T"]["biomass"]
         or not options["industry_t"]["endogen"]
     ):
-        n.madd(
+        batch.madd(
             "Link",
             nodes,
             suffix=" solid biomass for lowT industry",
@@ -3295,7 +3454,7 @@ def add_low_t_industry(n, nodes, industrial_demand, costs, must_run):
             lifetime=costs.at["solid biomass boiler steam", "lifetime"],
         )
 
-        n.madd(
+        batch.madd(
             "Link",
             nodes,
             suffix=" solid biomass for lowT industry CC",
@@ -3321,7 +3480,7 @@ def add_low_t_industry(n, nodes, industrial_demand, costs, must_run):
         )
 
     if options["industry_t"]["low_T"]["methane"]:
-        n.madd(
+        batch.madd(
             "Link",
             nodes,
             suffix=" gas for lowT industry",
@@ -3344,7 +3503,7 @@ def add_low_t_industry(n, nodes, industrial_demand, costs, must_run):
             - costs.at["gas", "CO2 intensity"]
             * costs.at["biomass CHP capture", "heat-input"]
         )
-        n.madd(
+        batch.madd(
             "Link",
             nodes,
             suffix=" gas for lowT industry CC",
@@ -3372,7 +3531,7 @@ def add_low_t_industry(n, nodes, industrial_demand, costs, must_run):
     if options["industry_t"]["low_T"]["heat_pumps"]:
         # high temperature industrial heat pump can heat up to 150°C
         eta = costs.at["industrial heat pump high temperature", "efficiency"]
-        n.madd(
+        batch.madd(
             "Link",
             nodes,
             suffix=" industrial heat pump steam for lowT industry",
@@ -3389,7 +3548,7 @@ def add_low_t_industry(n, nodes, industrial_demand, costs, must_run):
         )
 
     if options["industry_t"]["low_T"]["electric_boiler"]:
-        n.madd(
+        batch.madd(
             "Link",
             nodes,
             suffix=" electricity for lowT industry",
@@ -3405,10 +3564,130 @@ def add_low_t_industry(n, nodes, industrial_demand, costs, must_run):
             lifetime=costs.at["electric boiler steam", "lifetime"],
         )
 
+    return batch
+
+
+def add_biomass_direct_firing(batch, nodes, temperature, costs, must_run):
+    batch.madd(
+        "Link",
+        nodes,
+        suffix=f" solid biomass for {temperature} industry",
+        bus0=spatial.biomass.nodes,
+        bus1=nodes + f" {temperature} industry",
+        carrier=f"solid biomass for {temperature} industry",
+        p_nom_extendable=True,
+        p_min_pu=must_run,
+        efficiency=costs.at["direct firing solid fuels", "efficiency"],
+        capital_cost=costs.at["direct firing solid fuels", "fixed"]
+        * costs.at["direct firing solid fuels", "efficiency"],
+        marginal_cost=costs.at["direct firing solid fuels", "VOM"]
+        + costs.at["biomass boiler", "pelletizing cost"],
+        lifetime=costs.at["direct firing solid fuels", "lifetime"],
+    )
+
+    batch.madd(
+        "Link",
+        nodes,
+        suffix=f" solid biomass for {temperature} industry CC",
+        bus0=spatial.biomass.nodes,
+        bus1=nodes + f" {temperature} industry",
+        bus2=spatial.co2.nodes,
+        bus3="co2 atmosphere",
+        carrier=f"solid biomass for {temperature} industry CC",
+        p_nom_extendable=True,
+        p_min_pu=must_run,
+        efficiency=costs.at["direct firing solid fuels CC", "efficiency"],
+        capital_cost=costs.at["direct firing solid fuels CC", "fixed"]
+        * costs.at["direct firing solid fuels CC", "efficiency"]
+        + options["carbon_capture_cost_factor"]
+        * costs.at["biomass CHP capture", "fixed"]
+        * costs.at["solid biomass", "CO2 intensity"],
+        marginal_cost=costs.at["direct firing solid fuels CC", "VOM"]
+        + costs.at["biomass boiler", "pelletizing cost"],
+        efficiency2=costs.at["solid biomass", "CO2 intensity"]
+        * costs.at["biomass CHP capture", "capture_rate"],
+        efficiency3=-costs.at["solid biomass", "CO2 intensity"]
+        * costs.at["biomass CHP capture", "capture_rate"],
+        lifetime=costs.at["direct firing solid fuels CC", "lifetime"],
+    )
+
+
+def add_gas_direct_firing(batch, nodes, temperature, costs, must_run):
+    # TODO: add electricity input from DEA and adapt VOM to exclude electricity cost!
+    batch.madd(
+        "Link",
+        nodes,
+        suffix=f" gas for {temperature} industry",
+        bus0=spatial.gas.nodes,
+        bus1=nodes + f" {temperature} industry",
+        bus2="co2 atmosphere",
+        carrier=f"gas for {temperature} industry",
+        p_nom_extendable=True,
+        p_min_pu=must_run,
+        efficiency=costs.at["direct firing gas", "efficiency"],
+        efficiency2=costs.at["gas", "CO2 intensity"],
+        capital_cost=costs.at["direct firing gas", "fixed"]
+        * costs.at["direct firing gas", "efficiency"],
+        marginal_cost=costs.at["direct firing gas", "VOM"],
+        lifetime=costs.at["direct firing gas", "lifetime"],
+    )
+
+    eta = (
+        costs.at["direct firing gas", "efficiency"]
+        - costs.at["gas", "CO2 intensity"]
+        * costs.at["biomass CHP capture", "heat-input"]
+    )
+    batch.madd(
+        "Link",
+        nodes,
+        suffix=f" gas for {temperature} industry CC",
+        bus0=spatial.gas.nodes,
+        bus1=nodes + f" {temperature} industry",
+        bus2=spatial.co2.nodes,
+        bus3="co2 atmosphere",
+        carrier=f"gas for {temperature} industry CC",
+        p_nom_extendable=True,
+        p_min_pu=must_run,
+        efficiency=eta,
+        efficiency2=costs.at["gas", "CO2 intensity"]
+        * costs.at["biomass CHP capture", "capture_rate"],
+        efficiency3=costs.at["gas", "CO2 intensity"]
+        * (1 - costs.at["biomass CHP capture", "capture_rate"]),
+        capital_cost=costs.at["direct firing gas CC", "fixed"]
+        * costs.at["direct firing gas CC", "efficiency"]
+        + options["carbon_capture_cost_factor"]
+        * costs.at["biomass CHP capture", "fixed"]
+        * costs.at["gas", "CO2 intensity"],
+        marginal_cost=costs.at["direct firing gas CC", "VOM"],
+        lifetime=costs.at["direct firing gas", "lifetime"],
+    )
+
+
+def add_hydrogen_direct_firing(
+    batch, nodes, temperature, costs, must_run, lifetime=np.inf
+):
+    # TODO: research cost of industrial H2 combustion, here set to 10x methane combustion
+    batch.madd(
+        "Link",
+        nodes,
+        suffix=f" hydrogen for {temperature} industry",
+        bus0=nodes + " H2",
+        bus1=nodes + f" {temperature} industry",
+        carrier=f"hydrogen for {temperature} industry",
+        capital_cost=10
+        * costs.at["direct firing gas", "fixed"]
+        * costs.at["direct firing gas", "efficiency"],
+        marginal_cost=10 * costs.at["direct firing gas", "VOM"],
+        p_nom_extendable=True,
+        p_min_pu=must_run,
+        efficiency=costs.at["direct firing gas", "efficiency"],
+        lifetime=lifetime,
+    )
 
-def add_medium_t_industry(n, nodes, industrial_demand, costs, must_run):
+
+def build_medium_t_industry(nodes, methane_base_load, costs, must_run):
     """
-    Add medium temperature heat for industry.
+    Build medium temperature heat components for industry.
 
     Medium and high temperature heat demands are taken from today's
     industry methane demand and split according to config setting.
@@ -3416,140 +3695,42 @@ def add_medium_t_industry(n, nodes, industrial_demand, costs, must_run):
 
     logger.info("Add medium temperature industry.")
 
-    n.madd(
+    batch = ComponentBatch()
+    buses = nodes + " mediumT industry"
+
+    batch.madd(
         "Bus",
-        nodes + " mediumT industry",
+        buses,
         location=nodes,
         carrier="mediumT industry",
         unit="MWh_LHV",
     )
 
     share_m = options["industry_t"]["share_medium"]
-    n.madd(
+    batch.madd(
         "Load",
         nodes,
         suffix=" mediumT industry",
-        bus=nodes + " mediumT industry",
+        bus=buses,
         carrier="mediumT industry",
-        p_set=share_m * industrial_demand.loc[nodes, "methane"] / 8760.0,
+        p_set=share_m * methane_base_load,
     )
 
     if options["industry_t"]["medium_T"]["biomass"]:
-        n.madd(
-            "Link",
-            nodes,
-            suffix=" solid biomass for mediumT industry",
-            bus0=spatial.biomass.nodes,
-            bus1=nodes + " mediumT industry",
-            carrier="solid biomass for mediumT industry",
-            p_nom_extendable=True,
-            p_min_pu=must_run,
-            efficiency=costs.at["direct firing solid fuels", "efficiency"],
-            capital_cost=costs.at["direct firing solid fuels", "fixed"]
-            * costs.at["direct firing solid fuels", "efficiency"],
-            marginal_cost=costs.at["direct firing solid fuels", "VOM"]
-            + costs.at["biomass boiler", "pelletizing cost"],
-            lifetime=costs.at["direct firing solid fuels", "lifetime"],
-        )
-
-        n.madd(
-            "Link",
-            nodes,
-            suffix=" solid biomass for mediumT industry CC",
-            bus0=spatial.biomass.nodes,
-            bus1=nodes + " mediumT industry",
-            bus2=spatial.co2.nodes,
-            bus3="co2 atmosphere",
-            carrier="solid biomass for mediumT industry CC",
-            p_nom_extendable=True,
-            p_min_pu=must_run,
-            efficiency=costs.at["direct firing solid fuels CC", "efficiency"],
-            capital_cost=costs.at["direct firing solid fuels CC", "fixed"]
-            * costs.at["direct firing solid fuels CC", "efficiency"]
-            + options["carbon_capture_cost_factor"]
-            * costs.at["biomass CHP capture", "fixed"]
-            * costs.at["solid biomass", "CO2 intensity"],
-            marginal_cost=costs.at["direct firing solid fuels CC", "VOM"]
-            + costs.at["biomass boiler", "pelletizing cost"],
-            efficiency2=costs.at["solid biomass", "CO2 intensity"]
-            * costs.at["biomass CHP capture", "capture_rate"],
-            efficiency3=-costs.at["solid biomass", "CO2 intensity"]
-            * costs.at["biomass CHP capture", "capture_rate"],
-            lifetime=costs.at["direct firing solid fuels CC", "lifetime"],
-        )
+        add_biomass_direct_firing(batch, nodes, "mediumT", costs, must_run)
 
     if options["industry_t"]["medium_T"]["methane"]:
-        # TODO: add electricity input from DEA and adapt VOM to exclude electricity cost!
-        n.madd(
-            "Link",
-            nodes,
-            suffix=" gas for mediumT industry",
-            bus0=spatial.gas.nodes,
-            bus1=nodes + " mediumT industry",
-            bus2="co2 atmosphere",
-            carrier="gas for mediumT industry",
-            p_nom_extendable=True,
-            p_min_pu=must_run,
-            efficiency=costs.at["direct firing gas", "efficiency"],
-            efficiency2=costs.at["gas", "CO2 intensity"],
-            capital_cost=costs.at["direct firing gas", "fixed"]
-            * costs.at["direct firing gas", "efficiency"],
-            marginal_cost=costs.at["direct firing gas", "VOM"],
-            lifetime=costs.at["direct firing gas", "lifetime"],
-        )
-
-        eta = (
-            costs.at["direct firing gas", "efficiency"]
-            - costs.at["gas", "CO2 intensity"]
-            * costs.at["biomass CHP capture", "heat-input"]
-        )
-        n.madd(
-            "Link",
-            nodes,
-            suffix=" gas for mediumT industry CC",
-            bus0=spatial.gas.nodes,
-            bus1=nodes + " mediumT industry",
-            bus2=spatial.co2.nodes,
-            bus3="co2 atmosphere",
-            carrier="gas for mediumT industry CC",
-            p_nom_extendable=True,
-            p_min_pu=must_run,
-            efficiency=eta,
-            efficiency2=costs.at["gas", "CO2 intensity"]
-            * costs.at["biomass CHP capture", "capture_rate"],
-            efficiency3=costs.at["gas", "CO2 intensity"]
-            * (1 - costs.at["biomass CHP capture", "capture_rate"]),
-            capital_cost=costs.at["direct firing gas CC", "fixed"]
-            * costs.at["direct firing gas CC", "efficiency"]
-            + options["carbon_capture_cost_factor"]
-            * costs.at["biomass CHP capture", "fixed"]
-            * costs.at["gas", "CO2 intensity"],
-            marginal_cost=costs.at["direct firing gas CC", "VOM"],
-            lifetime=costs.at["direct firing gas", "lifetime"],
-        )
+        add_gas_direct_firing(batch, nodes, "mediumT", costs, must_run)
 
     if options["industry_t"]["medium_T"]["hydrogen"]:
-        # TODO: research cost of industrial H2 combustion, here set to 10x methane combustion
-        n.madd(
-            "Link",
-            nodes,
-            suffix=" hydrogen for mediumT industry",
-            bus0=nodes + " H2",
-            bus1=nodes + " mediumT industry",
-            carrier="hydrogen for mediumT industry",
-            capital_cost=10
-            * costs.at["direct firing gas", "fixed"]
-            * costs.at["direct firing gas", "efficiency"],
-            marginal_cost=10 * costs.at["direct firing gas", "VOM"],
-            p_nom_extendable=True,
-            p_min_pu=must_run,
-            efficiency=costs.at["direct firing gas", "efficiency"],
-        )
+        add_hydrogen_direct_firing(batch, nodes, "mediumT", costs, must_run)
 
+    return batch
 
-def add_high_t_industry(n, nodes, industrial_demand, costs, must_run):
+
+def build_high_t_industry(nodes, methane_base_load, costs, must_run):
     """
-    Add high temperature heat for industry.
+    Build high temperature heat components for industry.
 
     Medium and high temperature heat demands are taken from today's
     industry methane demand and split according to config setting.
@@ -3557,97 +3738,49 @@ def add_high_t_industry(n, nodes, industrial_demand, costs, must_run):
 
     logger.info("Add high temperature industry.")
 
-    n.madd("Bus", nodes + " highT industry", location=nodes, carrier="highT industry")
+    batch = ComponentBatch()
+    buses = nodes + " highT industry"
+
+    batch.madd("Bus", buses, location=nodes, carrier="highT industry")
 
     share_h = options["industry_t"]["share_high"]
 
-    n.madd(
+    batch.madd(
         "Load",
         nodes,
         suffix=" highT industry",
-        bus=nodes + " highT industry",
+        bus=buses,
         carrier="highT industry",
-        p_set=share_h * industrial_demand.loc[nodes, "methane"] / 8760.0,
+        p_set=share_h * methane_base_load,
     )
 
     if options["industry_t"]["high_T"]["methane"]:
-        n.madd(
-            "Link",
-            nodes,
-            suffix=" gas for highT industry",
-            bus0=spatial.gas.nodes,
-            bus1=nodes + " highT industry",
-            bus2="co2 atmosphere",
-            carrier="gas for highT industry",
-            p_nom_extendable=True,
-            p_min_pu=must_run,
-            efficiency=costs.at["direct firing gas", "efficiency"],
-            efficiency2=costs.at["gas", "CO2 intensity"],
-            capital_cost=costs.at["direct firing gas", "fixed"]
-            * costs.at["direct firing gas", "efficiency"],
-            marginal_cost=costs.at["direct firing gas", "VOM"],
-            lifetime=costs.at["direct firing gas", "lifetime"],
-        )
-
-        eta = (
-            costs.at["direct firing gas", "efficiency"]
-            - costs.at["gas", "CO2 intensity"]
-            * costs.at["biomass CHP capture", "heat-input"]
-        )
-        n.madd(
-            "Link",
-            nodes,
-            suffix=" gas for highT industry CC",
-            bus0=spatial.gas.nodes,
-            bus1=nodes + " highT industry",
-            bus2=spatial.co2.nodes,
-            bus3="co2 atmosphere",
-            carrier="gas for highT industry CC",
-            p_nom_extendable=True,
-            p_min_pu=must_run,
-            efficiency=eta,
-            efficiency2=costs.at["gas", "CO2 intensity"]
-            * costs.at["biomass CHP capture", "capture_rate"],
-            efficiency3=costs.at["gas", "CO2 intensity"]
-            * (1 - costs.at["biomass CHP capture", "capture_rate"]),
-            capital_cost=costs.at["direct firing gas CC", "fixed"]
-            * costs.at["direct firing gas CC", "efficiency"]
-            + options["carbon_capture_cost_factor"]
-            * costs.at["biomass CHP capture", "fixed"]
-            * costs.at["gas", "CO2 intensity"],
-            marginal_cost=costs.at["direct firing gas CC", "VOM"],
-            lifetime=costs.at["direct firing gas", "lifetime"],
-        )
+        add_gas_direct_firing(batch, nodes, "highT", costs, must_run)
 
     if options["industry_t"]["high_T"]["hydrogen"]:
-        # TODO: research cost of industrial H2 combustion, here set to 10x methane combustion
-        n.madd(
-            "Link",
+        add_hydrogen_direct_firing(
+            batch,
             nodes,
-            suffix=" hydrogen for highT industry",
-            bus0=nodes + " H2",
-            bus1=nodes + " highT industry",
-            carrier="hydrogen for highT industry",
-            capital_cost=10
-            * costs.at["direct firing gas", "fixed"]
-            * costs.at["direct firing gas", "efficiency"],
-            marginal_cost=10 * costs.at["direct firing gas", "VOM"],
-            p_nom_extendable=True,
-            p_min_pu=must_run,
-            efficiency=costs.at["direct firing gas", "efficiency"],
+            "highT",
+            costs,
+            must_run,
             lifetime=costs.at["direct firing gas", "lifetime"],
         )
 
+    return batch
+
 
-def add_exogen_t_industry(n, nodes, industrial_demand, costs):
+def build_exogen_t_industry(nodes, industrial_demand, costs):
     """
-    Add heat demand for industry with exogenous supply.
+    Build heat demand components for industry with exogenous supply.
 
     low temperature is supplied by biomass medium and high temperature
     is supplied by gas
     """
 
-    n.madd(
+    batch = ComponentBatch()
+
+    batch.madd(
         "Bus",
         spatial.biomass.industry,
         location=spatial.biomass.locations,
@@ -3657,15 +3790,13 @@ def add_exogen_t_industry(n, nodes, industrial_demand, costs):
 
     if options.get("biomass_spatial", options["biomass_transport"]):
         p_set = (
-            industrial_demand.loc[spatial.biomass.locations, "solid biomass"].rename(
-                index=lambda x: x + " solid biomass for industry"
-            )
-            / nhours
+            industrial_demand.loc[spatial.biomass.locations, "solid biomass"] / nhours
         )
+        p_set = p_set.set_axis(p_set.index + " solid biomass for industry")
     else:
         p_set = industrial_demand["solid biomass"].sum() / nhours
 
-    n.madd(
+    batch.madd(
         "Load",
         spatial.biomass.industry,
         bus=spatial.biomass.industry,
@@ -3673,7 +3804,7 @@ def add_exogen_t_industry(n, nodes, industrial_demand, costs):
         p_set=p_set,
     )
 
-    n.madd(
+    batch.madd(
         "Link",
         spatial.biomass.industry,
         bus0=spatial.biomass.nodes,
@@ -3688,7 +3819,7 @@ def add_exogen_t_industry(n, nodes, industrial_demand, costs):
     else:
         link_names = spatial.biomass.industry_cc
 
-    n.madd(
+    batch.madd(
         "Link",
         link_names,
         bus0=spatial.biomass.nodes,
@@ -3708,7 +3839,7 @@ def add_exogen_t_industry(n, nodes, industrial_demand, costs):
         lifetime=costs.at["cement capture", "lifetime"],
     )
 
-    n.madd(
+    batch.madd(
         "Bus",
         spatial.gas.industry,
         location=spatial.gas.locations,
@@ -3719,11 +3850,11 @@ def add_exogen_t_industry(n, nodes, industrial_demand, costs):
     gas_demand = industrial_demand.loc[nodes, "methane"] / nhours
 
     if options["gas_network"]:
-        spatial_gas_demand = gas_demand.rename(index=lambda x: x + " gas for industry")
+        spatial_gas_demand = gas_demand.set_axis(gas_demand.index + " gas for industry")
     else:
         spatial_gas_demand = gas_demand.sum()
 
-    n.madd(
+    batch.madd(
         "Load",
         spatial.gas.industry,
         bus=spatial.gas.industry,
@@ -3731,7 +3862,7 @@ def add_exogen_t_industry(n, nodes, industrial_demand, costs):
         p_set=spatial_gas_demand,
     )
 
-    n.madd(
+    batch.madd(
         "Link",
         spatial.gas.industry,
         bus0=spatial.gas.nodes,
@@ -3743,7 +3874,7 @@ def add_exogen_t_industry(n, nodes, industrial_demand, costs):
         efficiency2=costs.at["gas", "CO2 intensity"],
     )
 
-    n.madd(
+    batch.madd(
         "Link",
         spatial.gas.industry_cc,
         bus0=spatial.gas.nodes,
@@ -3763,6 +3894,217 @@ def add_exogen_t_industry(n, nodes, industrial_demand, costs):
         lifetime=costs.at["cement capture", "lifetime"],
     )
 
+    return batch
+
+
+def build_shipping_hydrogen(nodes, p_set, share, costs):
+    batch = ComponentBatch()
+
+    efficiency = (
+        options["shipping_oil_efficiency"] / costs.at["fuel cell", "efficiency"]
+    )
+
+    h2_nodes = nodes + " H2"
+
+    if options["shipping_hydrogen_liquefaction"]:
+        h2_liquid_nodes = h2_nodes + " liquid"
+
+        batch.madd(
+            "Bus",
+            h2_liquid_nodes,
+            carrier="H2 liquid",
+            location=nodes,
+            unit="MWh_LHV",
+        )
+
+        batch.madd(
+            "Link",
+            h2_nodes + " liquefaction",
+            bus0=h2_nodes,
+            bus1=h2_liquid_nodes,
+            carrier="H2 liquefaction",
+            efficiency=costs.at["H2 liquefaction", "efficiency"],
+            capital_cost=costs.at["H2 liquefaction", "fixed"],
+            p_nom_extendable=True,
+            lifetime=costs.at["H2 liquefaction", "lifetime"],
+        )
+
+        shipping_bus = h2_liquid_nodes
+    else:
+        shipping_bus = h2_nodes
+
+    batch.madd(
+        "Load",
+        nodes,
+        suffix=" H2 for shipping",
+        bus=shipping_bus,
+        carrier="H2 for shipping",
+        p_set=p_set * (share * efficiency),
+    )
+
+    return batch
+
+
+def build_shipping_methanol(nodes, p_set, share, costs):
+    batch = ComponentBatch()
+
+    efficiency = (
+        options["shipping_oil_efficiency"] / options["shipping_methanol_efficiency"]
+    )
+
+    p_set_methanol = p_set.set_axis(p_set.index + " shipping methanol") * (
+        share * efficiency
+    )
+
+    if not options["methanol"]["regional_methanol_demand"]:
+        p_set_methanol = p_set_methanol.sum()
+
+    batch.madd(
+        "Bus",
+        spatial.methanol.shipping,
+        location=spatial.methanol.demand_locations,
+        carrier="shipping methanol",
+        unit="MWh_LHV",
+    )
+
+    batch.madd(
+        "Load",
+        spatial.methanol.shipping,
+        bus=spatial.methanol.shipping,
+        carrier="shipping methanol",
+        p_set=p_set_methanol,
+    )
+
+    batch.madd(
+        "Link",
+        spatial.methanol.shipping,
+        bus0=spatial.methanol.nodes,
+        bus1=spatial.methanol.shipping,
+        bus2="co2 atmosphere",
+        carrier="shipping methanol",
+        p_nom_extendable=True,
+        efficiency2=1
+        / options[
+            "MWh_MeOH_per_tCO2"
+        ],  # CO2 intensity methanol based on stoichiometric calculation with 22.7 GJ/t methanol (32 g/mol), CO2 (44 g/mol), 277.78 MWh/TJ = 0.218 t/MWh
+    )
+
+    return batch
+
+
+def build_shipping_oil(nodes, p_set, share, costs):
+    batch = ComponentBatch()
+
+    p_set_oil = p_set.set_axis(p_set.index + " shipping oil") * share
+
+    if not options["regional_oil_demand"]:
+        p_set_oil = p_set_oil.sum()
+
+    batch.madd(
+        "Bus",
+        spatial.oil.shipping,
+        location=spatial.oil.demand_locations,
+        carrier="shipping oil",
+        unit="MWh_LHV",
+    )
+
+    batch.madd(
+        "Load",
+        spatial.oil.shipping,
+        bus=spatial.oil.shipping,
+        carrier="shipping oil",
+        p_set=p_set_oil,
+    )
+
+    batch.madd(
+        "Link",
+        spatial.oil.shipping,
+        bus0=spatial.oil.nodes,
+        bus1=spatial.oil.shipping,
+        bus2="co2 atmosphere",
+        carrier="shipping oil",
+        p_nom_extendable=True,
+        efficiency2=costs.at["oil", "CO2 intensity"],
+    )
+
+    return batch
+
+
+def build_shipping_gas(nodes, p_set, share, costs):
+    batch = ComponentBatch()
+
+    efficiency = options["shipping_oil_efficiency"] / options["shipping_gas_efficiency"]
+
+    p_set_gas = p_set.set_axis(p_set.index + " shipping gas") * (share * efficiency)
+
+    if not options["gas_network"]:
+        p_set_gas = p_set_gas.sum()
+
+    batch.madd(
+        "Bus",
+        spatial.gas.shipping,
+        location=spatial.gas.locations,
+        carrier="shipping gas",
+        unit="MWh_LHV",
+    )
+
+    batch.madd(
+        "Load",
+        spatial.gas.shipping,
+        bus=spatial.gas.shipping,
+        carrier="shipping gas",
+        p_set=p_set_gas,
+    )
+
+    batch.madd(
+        "Link",
+        spatial.gas.shipping,
+        bus0=spatial.gas.nodes,
+        bus1=spatial.gas.shipping,
+        bus2="co2 atmosphere",
+        carrier="shipping gas",
+        p_nom_extendable=True,
+        efficiency2=costs.at["gas", "CO2 intensity"],
+    )
+
+    return batch
+
+
+def build_shipping_ammonia(nodes, p_set, share, costs):
+    batch = ComponentBatch()
+
+    p_set_ammonia = p_set.set_axis(p_set.index + " shipping ammonia") * share
+
+    if options["ammonia"] != "regional":
+        p_set_ammonia = p_set_ammonia.sum()
+
+    batch.madd(
+        "Bus",
+        spatial.ammonia.shipping,
+        location=spatial.ammonia.locations,
+        carrier="shipping ammonia",
+        unit="MWh_LHV",
+    )
+
+    batch.madd(
+        "Load",
+        spatial.ammonia.shipping,
+        bus=spatial.ammonia.shipping,
+        carrier="shipping ammonia",
+        p_set=p_set_ammonia,
+    )
+
+    batch.madd(
+        "Link",
+        spatial.ammonia.shipping,
+        bus0=spatial.ammonia.nodes,
+        bus1=spatial.ammonia.shipping,
+        carrier="shipping ammonia",
+        p_nom_extendable=True,
+    )
+
+    return batch
+
 
 def add_industry(n, costs):
     logger.info("Add industrial demand")
@@ -3776,10 +4118,17 @@ def add_industry(n, costs):
     nhours = n.snapshot_weightings.generators.sum()
     nyears = nhours / 8760
 
+    cache_dir = snakemake.params.fast_io_cache if options.get("fast_io") else None
+
     # 1e6 to convert TWh to MWh
     industrial_demand = (
-        pd.read_csv(snakemake.input.industrial_demand, index_col=0) * 1e6
+        read_csv_cached(snakemake.input.industrial_demand, cache_dir) * 1e6
     ) * nyears
+    # average nodal demand in MW
+    industrial_load = industrial_demand.loc[nodes] / nhours
+
+    # components are collected and added to the network in grouped calls
+    batch = ComponentBatch()
 
     # endogenous heat supply for industry
     if options["industry_t"]["endogen"]:
@@ -3788,26 +4137,27 @@ def add_industry(n, costs):
             f"Endogenise heat supply of industry with must run condition {must_run}"
         )
 
-        add_low_t_industry(n, nodes, industrial_demand, costs, must_run)
-
-        add_medium_t_industry(n, nodes, industrial_demand, costs, must_run)
+        # today's methane demand is split between medium and high temperature
+        methane_base_load = industrial_demand.loc[nodes, "methane"] / 8760.0
 
-        add_high_t_industry(n, nodes, industrial_demand, costs, must_run)
+        batch.extend(build_low_t_industry(nodes, industrial_demand, costs, must_run))
+        batch.extend(build_medium_t_industry(nodes, methane_base_load, costs, must_run))
+        batch.extend(build_high_t_industry(nodes, methane_base_load, costs, must_run))
     else:
-        add_exogen_t_industry(n, nodes, industrial_demand, costs)
+        batch.extend(build_exogen_t_industry(nodes, industrial_demand, costs))
 
-    n.madd(
+    batch.madd(
         "Load",
         nodes,
         suffix=" H2 for industry",
         bus=nodes + " H2",
         carrier="H2 for industry",
-        p_set=industrial_demand.loc[nodes, "hydrogen"] / nhours,
+        p_set=industrial_load["hydrogen"],
     )
 
     # methanol for industry
 
-    n.madd(
+    batch.madd(
         "Bus",
         spatial.methanol.industry,
         carrier="industry methanol",
@@ -3815,15 +4165,14 @@ def add_industry(n, costs):
         unit="MWh_LHV",
     )
 
-    p_set_methanol = (
-        industrial_demand["methanol"].rename(lambda x: x + " industry methanol")
-        / nhours
+    p_set_methanol = (industrial_demand["methanol"] / nhours).set_axis(
+        industrial_demand.index + " industry methanol"
     )
 
     if not options["methanol"]["regional_methanol_demand"]:
         p_set_methanol = p_set_methanol.sum()
 
-    n.madd(
+    batch.madd(
         "Load",
         spatial.methanol.industry,
         bus=spatial.methanol.industry,
@@ -3831,7 +4180,7 @@ def add_industry(n, costs):
         p_set=p_set_methanol,
     )
 
-    n.madd(
+    batch.madd(
         "Link",
         spatial.methanol.industry,
         bus0=spatial.methanol.nodes,
@@ -3843,7 +4192,7 @@ def add_industry(n, costs):
         # CO2 intensity methanol based on stoichiometric calculation with 22.7 GJ/t methanol (32 g/mol), CO2 (44 g/mol), 277.78 MWh/TJ = 0.218 t/MWh
     )
 
-    n.madd(
+    batch.madd(
         "Link",
         spatial.h2.locations + " methanolisation",
         bus0=spatial.h2.nodes,
@@ -3863,19 +4212,19 @@ def add_industry(n, costs):
         efficiency3=-options["MWh_MeOH_per_MWh_H2"] / options["MWh_MeOH_per_tCO2"],
     )
 
-    shipping_hydrogen_share = get(options["shipping_hydrogen_share"], investment_year)
-    shipping_oil_share = get(options["shipping_oil_share"], investment_year)
-    shipping_gas_share = get(options["shipping_gas_share"], investment_year)
-    shipping_methanol_share = get(options["shipping_methanol_share"], investment_year)
-    shipping_ammonia_share = get(options["shipping_ammonia_share"], investment_year)
+    shipping_fuels = {
+        "hydrogen": build_shipping_hydrogen,
+        "methanol": build_shipping_methanol,
+        "oil": build_shipping_oil,
+        "gas": build_shipping_gas,
+        "ammonia": build_shipping_ammonia,
+    }
+    shipping_shares = {
+        fuel: get(options[f"shipping_{fuel}_share"], investment_year)
+        for fuel in shipping_fuels
+    }
 
-    total_share = (
-        shipping_hydrogen_share
-        + shipping_methanol_share
-        + shipping_oil_share
-        + shipping_gas_share
-        + shipping_ammonia_share
-    )
+    total_share = sum(shipping_shares.values())
     if total_share != 1:
         logger.warning(
             f"Total shipping shares sum up to {total_share:.2%}, corresponding to increased or decreased demand assumptions."
@@ -3885,223 +4234,26 @@ def add_industry(n, costs):
         nodes, ["total domestic navigation"]
     ].squeeze()
     international_navigation = (
-        pd.read_csv(snakemake.input.shipping_demand, index_col=0).squeeze(axis=1)
+        read_csv_cached(snakemake.input.shipping_demand, cache_dir).squeeze(axis=1)
         * nyears
     )
     all_navigation = domestic_navigation + international_navigation
-    p_set = all_navigation * 1e6 / nhours
-
-    if shipping_hydrogen_share:
-        oil_efficiency = options.get(
-            "shipping_oil_efficiency", options.get("shipping_average_efficiency", 0.4)
-        )
-        efficiency = oil_efficiency / costs.at["fuel cell", "efficiency"]
-        shipping_hydrogen_share = get(
-            options["shipping_hydrogen_share"], investment_year
-        )
-
-        if options["shipping_hydrogen_liquefaction"]:
-            n.madd(
-                "Bus",
-                nodes,
-                suffix=" H2 liquid",
-                carrier="H2 liquid",
-                location=nodes,
-                unit="MWh_LHV",
-            )
-
-            n.madd(
-                "Link",
-                nodes + " H2 liquefaction",
-                bus0=nodes + " H2",
-                bus1=nodes + " H2 liquid",
-                carrier="H2 liquefaction",
-                efficiency=costs.at["H2 liquefaction", "efficiency"],
-                capital_cost=costs.at["H2 liquefaction", "fixed"],
-                p_nom_extendable=True,
-                lifetime=costs.at["H2 liquefaction", "lifetime"],
-            )
-
-            shipping_bus = nodes + " H2 liquid"
-        else:
-            shipping_bus = nodes + " H2"
-
-        efficiency = (
-            options["shipping_oil_efficiency"] / costs.at["fuel cell", "efficiency"]
-        )
-        p_set_hydrogen = shipping_hydrogen_share * p_set * efficiency
-
-        n.madd(
-            "Load",
-            nodes,
-            suffix=" H2 for shipping",
-            bus=shipping_bus,
-            carrier="H2 for shipping",
-            p_set=p_set_hydrogen,
-        )
-
-    if shipping_methanol_share:
-        efficiency = (
-            options["shipping_oil_efficiency"] / options["shipping_methanol_efficiency"]
-        )
-
-        p_set_methanol_shipping = (
-            shipping_methanol_share
-            * p_set.rename(lambda x: x + " shipping methanol")
-            * efficiency
-        )
-
-        if not options["methanol"]["regional_methanol_demand"]:
-            p_set_methanol_shipping = p_set_methanol_shipping.sum()
-
-        n.madd(
-            "Bus",
-            spatial.methanol.shipping,
-            location=spatial.methanol.demand_locations,
-            carrier="shipping methanol",
-            unit="MWh_LHV",
-        )
-
-        n.madd(
-            "Load",
-            spatial.methanol.shipping,
-            bus=spatial.methanol.shipping,
-            carrier="shipping methanol",
-            p_set=p_set_methanol_shipping,
-        )
-
-        n.madd(
-            "Link",
-            spatial.methanol.shipping,
-            bus0=spatial.methanol.nodes,
-            bus1=spatial.methanol.shipping,
-            bus2="co2 atmosphere",
-            carrier="shipping methanol",
-            p_nom_extendable=True,
-            efficiency2=1
-            / options[
-                "MWh_MeOH_per_tCO2"
-            ],  # CO2 intensity methanol based on stoichiometric calculation with 22.7 GJ/t methanol (32 g/mol), CO2 (44 g/mol), 277.78 MWh/TJ = 0.218 t/MWh
-        )
-
-    if shipping_oil_share:
-
-        p_set_oil = shipping_oil_share * p_set.rename(lambda x: x + " shipping oil")
-
-        if not options["regional_oil_demand"]:
-            p_set_oil = p_set_oil.sum()
-
-        n.madd(
-            "Bus",
-            spatial.oil.shipping,
-            location=spatial.oil.demand_locations,
-            carrier="shipping oil",
-            unit="MWh_LHV",
-        )
-
-        n.madd(
-            "Load",
-            spatial.oil.shipping,
-            bus=spatial.oil.shipping,
-            carrier="shipping oil",
-            p_set=p_set_oil,
-        )
-
-        n.madd(
-            "Link",
-            spatial.oil.shipping,
-            bus0=spatial.oil.nodes,
-            bus1=spatial.oil.shipping,
-            bus2="co2 atmosphere",
-            carrier="shipping oil",
-            p_nom_extendable=True,
-            efficiency2=costs.at["oil", "CO2 intensity"],
-        )
-
-    if shipping_gas_share:
-        efficiency = (
-            options["shipping_oil_efficiency"] / options["shipping_gas_efficiency"]
-        )
-
-        p_set_gas = (
-            efficiency
-            * shipping_gas_share
-            * p_set.rename(lambda x: x + " shipping gas")
-        )
-
-        if not options["gas_network"]:
-            p_set_gas = p_set_gas.sum()
-
-        n.madd(
-            "Bus",
-            spatial.gas.shipping,
-            location=spatial.gas.locations,
-            carrier="shipping gas",
-            unit="MWh_LHV",
-        )
-
-        n.madd(
-            "Load",
-            spatial.gas.shipping,
-            bus=spatial.gas.shipping,
-            carrier="shipping gas",
-            p_set=p_set_gas,
-        )
+    # scale once to MW and fold shares and efficiencies into a single scalar
+    # per fuel, so that each fuel only allocates one new Series
+    p_set = all_navigation * (1e6 / nhours)
 
-        n.madd(
-            "Link",
-            spatial.gas.shipping,
-            bus0=spatial.gas.nodes,
-            bus1=spatial.gas.shipping,
-            bus2="co2 atmosphere",
-            carrier="shipping gas",
-            p_nom_extendable=True,
-            efficiency2=costs.at["gas", "CO2 intensity"],
-        )
-
-    if shipping_ammonia_share:
-        efficiency = (
-            options["shipping_oil_efficiency"] / options["shipping_ammonia_efficiency"]
-        )
-
-        p_set_ammonia = shipping_ammonia_share * p_set.rename(
-            lambda x: x + " shipping ammonia"
-        )
-
-        if options["ammonia"] != "regional":
-            p_set_ammonia = p_set_ammonia.sum()
-
-        n.madd(
-            "Bus",
-            spatial.ammonia.shipping,
-            location=spatial.ammonia.locations,
-            carrier="shipping ammonia",
-            unit="MWh_LHV",
-        )
-
-        n.madd(
-            "Load",
-            spatial.ammonia.shipping,
-            bus=spatial.ammonia.shipping,
-            carrier="shipping ammonia",
-            p_set=p_set_ammonia,
-        )
-
-        n.madd(
-            "Link",
-            spatial.ammonia.shipping,
-            bus0=spatial.ammonia.nodes,
-            bus1=spatial.ammonia.shipping,
-            carrier="shipping ammonia",
-            p_nom_extendable=True,
-        )
+    for fuel, build_shipping_fuel in shipping_fuels.items():
+        share = shipping_shares[fuel]
+        if not share:
+            continue
+        batch.extend(build_shipping_fuel(nodes, p_set, share, costs))
 
     if options["oil_boilers"]:
         nodes = pop_layout.index
 
         for heat_system in HeatSystem:
             if not heat_system == HeatSystem.URBAN_CENTRAL:
-                n.madd(
+                batch.madd(
                     "Link",
                     nodes + f" {heat_system} oil boiler",
                     p_nom_extendable=True,
@@ -4119,7 +4271,7 @@ def add_industry(n, costs):
                     lifetime=costs.at["decentral oil boiler", "lifetime"],
                 )
 
-    n.madd(
+    batch.madd(
         "Link",
         nodes + " Fischer-Tropsch",
         bus0=nodes + " H2",
@@ -4143,18 +4295,14 @@ def add_industry(n, costs):
     if demand_factor != 1:
         logger.warning(f"Changing HVC demand by {demand_factor*100-100:+.2f}%.")
 
-    p_set_naphtha = (
-        demand_factor
-        * industrial_demand.loc[nodes, "naphtha"].rename(
-            lambda x: x + " naphtha for industry"
-        )
-        / nhours
+    p_set_naphtha = (demand_factor * industrial_load["naphtha"]).set_axis(
+        industrial_load.index + " naphtha for industry"
     )
 
     if not options["regional_oil_demand"]:
         p_set_naphtha = p_set_naphtha.sum()
 
-    n.madd(
+    batch.madd(
         "Bus",
         spatial.oil.naphtha,
         location=spatial.oil.demand_locations,
@@ -4162,7 +4310,7 @@ def add_industry(n, costs):
         unit="MWh_LHV",
     )
 
-    n.madd(
+    batch.madd(
         "Load",
         spatial.oil.naphtha,
         bus=spatial.oil.naphtha,
@@ -4172,9 +4320,11 @@ def add_industry(n, costs):
 
     # some CO2 from naphtha are process emissions from steam cracker
     # rest of CO2 released to atmosphere either in waste-to-energy or decay
+    naphtha_totals = industrial_demand.loc[
+        nodes, ["process emission from feedstock", "naphtha"]
+    ].sum()
     process_co2_per_naphtha = (
-        industrial_demand.loc[nodes, "process emission from feedstock"].sum()
-        / industrial_demand.loc[nodes, "naphtha"].sum()
+        naphtha_totals["process emission from feedstock"] / naphtha_totals["naphtha"]
     )
     emitted_co2_per_naphtha = costs.at["oil", "CO2 intensity"] - process_co2_per_naphtha
 
@@ -4189,7 +4339,7 @@ def add_industry(n, costs):
             pd.Index(spatial.oil.demand_locations) + " non-sequestered HVC"
         )
 
-        n.madd(
+        batch.madd(
             "Bus",
             non_sequestered_hvc_locations,
             location=spatial.oil.demand_locations,
@@ -4197,7 +4347,7 @@ def add_industry(n, costs):
             unit="MWh_LHV",
         )
 
-        n.madd(
+        batch.madd(
             "Link",
             spatial.oil.naphtha,
             bus0=spatial.oil.nodes,
@@ -4213,7 +4363,7 @@ def add_industry(n, costs):
         )
 
         if options.get("biomass", True) and options["municipal_solid_waste"]:
-            n.madd(
+            batch.madd(
                 "Link",
                 spatial.msw.locations,
                 bus0=spatial.msw.nodes,
@@ -4227,7 +4377,7 @@ def add_industry(n, costs):
                 ],  # because msw is co2 neutral and will be burned in waste CHP or decomposed as oil
             )
 
-        n.madd(
+        batch.madd(
             "Link",
             spatial.oil.demand_locations,
             suffix=" HVC to air",
@@ -4243,14 +4393,18 @@ def add_industry(n, costs):
         else:
             waste_source = non_sequestered_hvc_locations
 
+        # bus and link names shared by both waste CHP variants
+        waste_chp_nodes = spatial.nodes + " waste CHP"
+        urban_central_heat_nodes = spatial.nodes + " urban central heat"
+
         if cf_industry["waste_to_energy"]:
 
-            n.madd(
+            batch.madd(
                 "Link",
-                spatial.nodes + " waste CHP",
+                waste_chp_nodes,
                 bus0=waste_source,
                 bus1=spatial.nodes,
-                bus2=spatial.nodes + " urban central heat",
+                bus2=urban_central_heat_nodes,
                 bus3="co2 atmosphere",
                 carrier="waste CHP",
                 p_nom_extendable=True,
@@ -4265,12 +4419,12 @@ def add_industry(n, costs):
 
         if cf_industry["waste_to_energy_cc"]:
 
-            n.madd(
+            batch.madd(
                 "Link",
-                spatial.nodes + " waste CHP CC",
+                waste_chp_nodes + " CC",
                 bus0=waste_source,
                 bus1=spatial.nodes,
-                bus2=spatial.nodes + " urban central heat",
+                bus2=urban_central_heat_nodes,
                 bus3="co2 atmosphere",
                 bus4=spatial.co2.nodes,
                 carrier="waste CHP CC",
@@ -4291,7 +4445,7 @@ def add_industry(n, costs):
 
     else:
 
-        n.madd(
+        batch.madd(
             "Link",
             spatial.oil.naphtha,
             bus0=spatial.oil.nodes,
@@ -4304,9 +4458,6 @@ def add_industry(n, costs):
             efficiency3=process_co2_per_naphtha,
         )
 
-    if options["methanol"]["methanol_to_olefins"]:
-        add_methanol_to_olefins(n, costs)
-
     # aviation
     demand_factor = options.get("aviation_demand_factor", 1)
     if demand_factor != 1:
@@ -4315,16 +4466,14 @@ def add_industry(n, costs):
     all_aviation = ["total international aviation", "total domestic aviation"]
 
     p_set = (
-        demand_factor
-        * pop_weighted_energy_totals.loc[nodes, all_aviation].sum(axis=1)
-        * 1e6
-        / nhours
-    ).rename(lambda x: x + " kerosene for aviation")
+        pop_weighted_energy_totals.loc[nodes, all_aviation].sum(axis=1)
+        * (demand_factor * 1e6 / nhours)
+    ).set_axis(nodes + " kerosene for aviation")
 
     if not options["regional_oil_demand"]:
         p_set = p_set.sum()
 
-    n.madd(
+    batch.madd(
         "Bus",
         spatial.oil.kerosene,
         location=spatial.oil.demand_locations,
@@ -4332,7 +4481,7 @@ def add_industry(n, costs):
         unit="MWh_LHV",
     )
 
-    n.madd(
+    batch.madd(
         "Load",
         spatial.oil.kerosene,
         bus=spatial.oil.kerosene,
@@ -4340,7 +4489,7 @@ def add_industry(n, costs):
         p_set=p_set,
     )
 
-    n.madd(
+    batch.madd(
         "Link",
         spatial.oil.kerosene,
         bus0=spatial.oil.nodes,
@@ -4351,52 +4500,46 @@ def add_industry(n, costs):
         efficiency2=costs.at["oil", "CO2 intensity"],
     )
 
-    if options["methanol"]["methanol_to_kerosene"]:
-        add_methanol_to_kerosene(n, costs)
-
-    # TODO simplify bus expression
-    n.madd(
+    # supply from district heating where available, decentral heating otherwise
+    urban_central_heat = nodes + " urban central heat"
+    low_temperature_heat_bus = np.where(
+        urban_central_heat.isin(n.buses.index),
+        urban_central_heat,
+        nodes + " services urban decentral heat",
+    )
+    batch.madd(
         "Load",
         nodes,
         suffix=" low-temperature heat for industry",
-        bus=[
-            (
-                node + " urban central heat"
-                if node + " urban central heat" in n.buses.index
-                else node + " services urban decentral heat"
-            )
-            for node in nodes
-        ],
+        bus=low_temperature_heat_bus,
         carrier="low-temperature heat for industry",
-        p_set=industrial_demand.loc[nodes, "low-temperature heat"] / nhours,
+        p_set=industrial_load["low-temperature heat"],
     )
 
     # remove today's industrial electricity demand by scaling down total electricity demand
-    for ct in n.buses.country.dropna().unique():
-        # TODO map onto n.bus.country
-
-        loads_i = n.loads.index[
-            (n.loads.index.str[:2] == ct) & (n.loads.carrier == "electricity")
-        ]
-        if n.loads_t.p_set[loads_i].empty:
-            continue
-        factor = (
-            1
-            - industrial_demand.loc[loads_i, "current electricity"].sum()
-            / n.loads_t.p_set[loads_i].sum().sum()
-        )
-        n.loads_t.p_set[loads_i] *= factor
-
-    n.madd(
+    electricity_loads = n.loads.bus[n.loads.carrier.to_numpy() == "electricity"]
+    load_country = electricity_loads.map(n.buses.country).dropna()
+    loads_i = load_country.index
+    if not loads_i.empty:
+        current_electricity = (
+            industrial_demand.loc[loads_i, "current electricity"]
+            .groupby(load_country)
+            .sum()
+        )
+        total_electricity = n.loads_t.p_set[loads_i].sum().groupby(load_country).sum()
+        factor = 1 - current_electricity / total_electricity
+        n.loads_t.p_set[loads_i] *= load_country.map(factor)
+
+    batch.madd(
         "Load",
         nodes,
         suffix=" industry electricity",
         bus=nodes,
         carrier="industry electricity",
-        p_set=industrial_demand.loc[nodes, "electricity"] / nhours,
+        p_set=industrial_load["electricity"],
     )
 
-    n.madd(
+    batch.madd(
         "Bus",
         spatial.co2.process_emissions,
         location=spatial.co2.locations,
@@ -4405,16 +4548,13 @@ def add_industry(n, costs):
     )
 
     if options["co2_spatial"] or options["co2network"]:
-        p_set = (
-            -industrial_demand.loc[nodes, "process emission"].rename(
-                index=lambda x: x + " process emissions"
-            )
-            / nhours
+        p_set = (-industrial_load["process emission"]).set_axis(
+            industrial_load.index + " process emissions"
         )
     else:
-        p_set = -industrial_demand.loc[nodes, "process emission"].sum() / nhours
+        p_set = -industrial_load["process emission"].sum()
 
-    n.madd(
+    batch.madd(
         "Load",
         spatial.co2.process_emissions,
         bus=spatial.co2.process_emissions,
@@ -4422,7 +4562,7 @@ def add_industry(n, costs):
         p_set=p_set,
     )
 
-    n.madd(
+    batch.madd(
         "Link",
         spatial.co2.process_emissions,
         bus0=spatial.co2.process_emissions,
@@ -4433,7 +4573,7 @@ def add_industry(n, costs):
     )
 
     # assume enough local waste heat for CC
-    n.madd(
+    batch.madd(
         "Link",
         spatial.co2.locations,
         suffix=" process emissions CC",
@@ -4450,16 +4590,12 @@ def add_industry(n, costs):
 
     if options.get("ammonia"):
         if options["ammonia"] == "regional":
-            p_set = (
-                industrial_demand.loc[spatial.ammonia.locations, "ammonia"].rename(
-                    index=lambda x: x + " NH3"
-                )
-                / nhours
-            )
+            p_set = industrial_demand.loc[spatial.ammonia.locations, "ammonia"] / nhours
+            p_set = p_set.set_axis(p_set.index + " NH3")
         else:
             p_set = industrial_demand["ammonia"].sum() / nhours
 
-        n.madd(
+        batch.madd(
             "Load",
             spatial.ammonia.nodes,
             bus=spatial.ammonia.nodes,
@@ -4471,17 +4607,17 @@ def add_industry(n, costs):
         add_carrier_buses(n, "coal")
 
         mwh_coal_per_mwh_coke = 1.366  # from eurostat energy balance
-        p_set = (
-            industrial_demand["coal"]
-            + mwh_coal_per_mwh_coke * industrial_demand["coke"]
-        ) / nhours
-
-        p_set.rename(lambda x: x + " coal for industry", inplace=True)
+        coal = industrial_demand["coal"].to_numpy()
+        coke = industrial_demand["coke"].to_numpy()
+        p_set = pd.Series(
+            (coal + mwh_coal_per_mwh_coke * coke) / nhours,
+            index=industrial_demand.index + " coal for industry",
+        )
 
         if not options["regional_coal_demand"]:
             p_set = p_set.sum()
 
-        n.madd(
+        batch.madd(
             "Bus",
             spatial.coal.industry,
             location=spatial.coal.demand_locations,
@@ -4489,7 +4625,7 @@ def add_industry(n, costs):
             unit="MWh_LHV",
         )
 
-        n.madd(
+        batch.madd(
             "Load",
             spatial.coal.industry,
             bus=spatial.coal.industry,
@@ -4497,7 +4633,7 @@ def add_industry(n, costs):
             p_set=p_set,
         )
 
-        n.madd(
+        batch.madd(
             "Link",
             spatial.coal.industry,
             bus0=spatial.coal.nodes,
@@ -4508,6 +4644,14 @@ def add_industry(n, costs):
             efficiency2=costs.at["coal", "CO2 intensity"],
         )
 
+    batch.apply(n)
+
+    if options["methanol"]["methanol_to_olefins"]:
+        add_methanol_to_olefins(n, costs)
+
+    if options["methanol"]["methanol_to_kerosene"]:
+        add_methanol_to_kerosene(n, costs)
+
 
 def add_waste_heat(n):
     # TODO options?
@@ -4519,33 +4663,36 @@ def add_waste_heat(n):
     if not urban_central.empty:
         urban_central = urban_central.str[: -len(" urban central heat")]
 
-        link_carriers = n.links.carrier.unique()
+        urban_central_heat = urban_central + " urban central heat"
+        link_carriers = set(n.links.carrier.unique())
+
+        def residual_heat(links_i, total_efficiency, share):
+            # usable share of the conversion losses, computed on the raw array
+            efficiency = n.links.loc[links_i, "efficiency"].to_numpy()
+            return (total_efficiency - efficiency) * share
 
         # TODO what is the 0.95 and should it be a config option?
         if (
             options["use_fischer_tropsch_waste_heat"]
             and "Fischer-Tropsch" in link_carriers
         ):
-            n.links.loc[urban_central + " Fischer-Tropsch", "bus3"] = (
-                urban_central + " urban central heat"
+            links_i = urban_central + " Fischer-Tropsch"
+            n.links.loc[links_i, "bus3"] = urban_central_heat
+            n.links.loc[links_i, "efficiency3"] = residual_heat(
+                links_i, 0.95, options["use_fischer_tropsch_waste_heat"]
             )
-            n.links.loc[urban_central + " Fischer-Tropsch", "efficiency3"] = (
-                0.95 - n.links.loc[urban_central + " Fischer-Tropsch", "efficiency"]
-            ) * options["use_fischer_tropsch_waste_heat"]
 
         if options["use_methanation_waste_heat"] and "Sabatier" in link_carriers:
-            n.links.loc[urban_central + " Sabatier", "bus3"] = (
-                urban_central + " urban central heat"
+            links_i = urban_central + " Sabatier"
+            n.links.loc[links_i, "bus3"] = urban_central_heat
+            n.links.loc[links_i, "efficiency3"] = residual_heat(
+                links_i, 0.95, options["use_methanation_waste_heat"]
             )
-            n.links.loc[urban_central + " Sabatier", "efficiency3"] = (
-                0.95 - n.links.loc[urban_central + " Sabatier", "efficiency"]
-            ) * options["use_methanation_waste_heat"]
 
         # DEA quotes 15% of total input (11% of which are high-value heat)
         if options["use_haber_bosch_waste_heat"] and "Haber-Bosch" in link_carriers:
-            n.links.loc[urban_central + " Haber-Bosch", "bus3"] = (
-                urban_central + " urban central heat"
-            )
+            links_i = urban_central + " Haber-Bosch"
+            n.links.loc[links_i, "bus3"] = urban_central_heat
             total_energy_input = (
                 cf_industry["MWh_H2_per_tNH3_electrolysis"]
                 + cf_industry["MWh_elec_per_tNH3_electrolysis"]
@@ -4554,7 +4701,7 @@ def add_waste_heat(n):
                 cf_industry["MWh_elec_per_tNH3_electrolysis"]
                 / cf_industry["MWh_NH3_per_tNH3"]
             )
-            n.links.loc[urban_central + " Haber-Bosch", "efficiency3"] = (
+            n.links.loc[links_i, "efficiency3"] = (
                 0.15 * total_energy_input / electricity_input
             ) * options["use_haber_bosch_waste_heat"]
 
@@ -4562,10 +4709,9 @@ def add_waste_heat(n):
             options["use_methanolisation_waste_heat"]
             and "methanolisation" in link_carriers
         ):
-            n.links.loc[urban_central + " methanolisation", "bus4"] = (
-                urban_central + " urban central heat"
-            )
-            n.links.loc[urban_central + " methanolisation", "efficiency4"] = (
+            links_i = urban_central + " methanolisation"
+            n.links.loc[links_i, "bus4"] = urban_central_heat
+            n.links.loc[links_i, "efficiency4"] = (
                 costs.at["methanolisation", "heat-output"]
                 / costs.at["methanolisation", "hydrogen-input"]
             ) * options["use_methanolisation_waste_heat"]
@@ -4575,20 +4721,18 @@ def add_waste_heat(n):
             options["use_electrolysis_waste_heat"]
             and "H2 Electrolysis" in link_carriers
         ):
-            n.links.loc[urban_central + " H2 Electrolysis", "bus2"] = (
-                urban_central + " urban central heat"
+            links_i = urban_central + " H2 Electrolysis"
+            n.links.loc[links_i, "bus2"] = urban_central_heat
+            n.links.loc[links_i, "efficiency2"] = residual_heat(
+                links_i, 0.84, options["use_electrolysis_waste_heat"]
             )
-            n.links.loc[urban_central + " H2 Electrolysis", "efficiency2"] = (
-                0.84 - n.links.loc[urban_central + " H2 Electrolysis", "efficiency"]
-            ) * options["use_electrolysis_waste_heat"]
 
         if options["use_fuel_cell_waste_heat"] and "H2 Fuel Cell" in link_carriers:
-            n.links.loc[urban_central + " H2 Fuel Cell", "bus2"] = (
-                urban_central + " urban central heat"
+            links_i = urban_central + " H2 Fuel Cell"
+            n.links.loc[links_i, "bus2"] = urban_central_heat
+            n.links.loc[links_i, "efficiency2"] = residual_heat(
+                links_i, 0.95, options["use_fuel_cell_waste_heat"]
             )
-            n.links.loc[urban_central + " H2 Fuel Cell", "efficiency2"] = (
-                0.95 - n.links.loc[urban_central + " H2 Fuel Cell", "efficiency"]
-            ) * options["use_fuel_cell_waste_heat"]
 
 
 def add_agriculture(n, costs):
@@ -4597,30 +4741,38 @@ def add_agriculture(n, costs):
     nodes = pop_layout.index
     nhours = n.snapshot_weightings.generators.sum()
 
+    # average nodal demand in MW from TWh
+    agriculture_load = pop_weighted_energy_totals.loc[
+        nodes,
+        [
+            "total agriculture electricity",
+            "total agriculture heat",
+            "total agriculture machinery",
+        ],
+    ] * (1e6 / nhours)
+
+    batch = ComponentBatch()
+
     # electricity
 
-    n.madd(
+    batch.madd(
         "Load",
         nodes,
         suffix=" agriculture electricity",
         bus=nodes,
         carrier="agriculture electricity",
-        p_set=pop_weighted_energy_totals.loc[nodes, "total agriculture electricity"]
-        * 1e6
-        / nhours,
+        p_set=agriculture_load["total agriculture electricity"],
     )
 
     # heat
 
-    n.madd(
+    batch.madd(
         "Load",
         nodes,
         suffix=" agriculture heat",
         bus=nodes + " services rural heat",
         carrier="agriculture heat",
-        p_set=pop_weighted_energy_totals.loc[nodes, "total agriculture heat"]
-        * 1e6
-        / nhours,
+        p_set=agriculture_load["total agriculture heat"],
     )
 
     # machinery
@@ -4636,9 +4788,7 @@ def add_agriculture(n, costs):
             f"Total agriculture machinery shares sum up to {total_share:.2%}, corresponding to increased or decreased demand assumptions."
         )
 
-    machinery_nodal_energy = (
-        pop_weighted_energy_totals.loc[nodes, "total agriculture machinery"] * 1e6
-    )
+    machinery_nodal_load = agriculture_load["total agriculture machinery"]
 
     if electric_share > 0:
         efficiency_gain = (
@@ -4646,26 +4796,24 @@ def add_agriculture(n, costs):
             / options["agriculture_machinery_electric_efficiency"]
         )
 
-        n.madd(
+        batch.madd(
             "Load",
             nodes,
             suffix=" agriculture machinery electric",
             bus=nodes,
             carrier="agriculture machinery electric",
-            p_set=electric_share / efficiency_gain * machinery_nodal_energy / nhours,
+            p_set=electric_share / efficiency_gain * machinery_nodal_load,
         )
 
     if oil_share > 0:
-        p_set = (
-            oil_share
-            * machinery_nodal_energy.rename(lambda x: x + " agriculture machinery oil")
-            / nhours
+        p_set = (oil_share * machinery_nodal_load).set_axis(
+            machinery_nodal_load.index + " agriculture machinery oil"
         )
 
         if not options["regional_oil_demand"]:
             p_set = p_set.sum()
 
-        n.madd(
+        batch.madd(
             "Bus",
             spatial.oil.agriculture_machinery,
             location=spatial.oil.demand_locations,
@@ -4673,7 +4821,7 @@ def add_agriculture(n, costs):
             unit="MWh_LHV",
         )
 
-        n.madd(
+        batch.madd(
             "Load",
             spatial.oil.agriculture_machinery,
             bus=spatial.oil.agriculture_machinery,
@@ -4681,7 +4829,7 @@ def add_agriculture(n, costs):
             p_set=p_set,
         )
 
-        n.madd(
+        batch.madd(
             "Link",
             spatial.oil.agriculture_machinery,
             bus0=spatial.oil.nodes,
@@ -4692,6 +4840,8 @@ def add_agriculture(n, costs):
             efficiency2=costs.at["oil", "CO2 intensity"],
         )
 
+    batch.apply(n)
+
 
 def add_green_imports(n, costs):
     """Add option to import green fuels at set marginal cost.
@@ -4713,16 +4863,22 @@ def add_green_imports(n, costs):
         f"Adding green import option for {list(options['green_import_carriers'].keys())}"
     )
 
+    # carriers without a CO2 intensity in the costs are treated as carbon-free
+    co2_intensities = costs["CO2 intensity"].fillna(0)
+
+    # the components of all carriers are added in one n.madd per type
+    batch = ComponentBatch()
+
     for carrier, tech in options["green_import_carriers"].items():
         # Add central bus and generator to create imported green fuels
-        n.add(
+        batch.madd(
             "Bus",
-            f"EU {carrier} green import",
+            [f"EU {carrier} green import"],
             carrier=carrier + " green import",
         )
-        n.add(
+        batch.madd(
             "Generator",
-            f"EU {carrier} green import",
+            [f"EU {carrier} green import"],
             bus=f"EU {carrier} green import",
             carrier=carrier + " green import",
             p_nom_extendable=True,
@@ -4734,12 +4890,8 @@ def add_green_imports(n, costs):
         # almost align with carrier names, except for the "H2" carrier
         # which is associated with `spatial.h2`, hence the `.lower()`.
         carrier_nodes = getattr(spatial, carrier.lower()).nodes
-        co2_intensity = (
-            costs.fillna(0).at[carrier, "CO2 intensity"]
-            if carrier in costs.index
-            else 0
-        )
-        n.madd(
+        co2_intensity = co2_intensities.get(carrier, 0)
+        batch.madd(
             "Link",
             carrier_nodes,
             suffix=" green import",
@@ -4754,6 +4906,8 @@ def add_green_imports(n, costs):
             p_min_pu=0.75,  # Minimum part-load to prevent wild fluctuations
         )
 
+    batch.apply(n)
+
 
 def decentral(n):
     """
@@ -4807,6 +4961,30 @@ aggregate_dict = {
 }
 
 
+@lru_cache(maxsize=None)
+def strip_heat_sector(name):
+    """
+    Drop the residential and services qualifiers from a component name.
+    """
+    return name.replace("residential ", "").replace("services ", "")
+
+
+def aggregate_heat_columns(df, func):
+    """
+    Aggregate the residential and services columns of a time-varying dataframe
+    onto their common name with aggregation ``func``.
+    """
+    keys = df.columns.str.replace("residential ", "", regex=False).str.replace(
+        "services ", "", regex=False
+    )
+    if func == "first":
+        # time series contain no NaNs, so the first column of each group can
+        # be selected directly instead of grouping the transposed frame
+        first = ~keys.duplicated()
+        return df.loc[:, first].set_axis(keys[first], axis=1).sort_index(axis=1)
+    return df.T.groupby(keys).agg(func).T
+
+
 def cluster_heat_buses(n):
     """
     Cluster residential and service heat buses to one representative bus.
@@ -4843,13 +5021,9 @@ def cluster_heat_buses(n):
         cols = df.columns[df.columns.str.contains("bus") | (df.columns == "carrier")]
 
         # rename columns and index
-        df[cols] = df[cols].apply(
-            lambda x: x.str.replace("residential ", "").str.replace("services ", ""),
-            axis=1,
-        )
-        df = df.rename(
-            index=lambda x: x.replace("residential ", "").replace("services ", "")
-        )
+        for col in cols:
+            df[col] = df[col].map(strip_heat_sector, na_action="ignore")
+        df = df.set_axis(df.index.map(strip_heat_sector))
 
         # cluster heat nodes
         # static dataframe
@@ -4859,11 +5033,7 @@ def cluster_heat_buses(n):
         pnl = c.pnl
         agg = define_clustering(pd.Index(pnl.keys()), aggregate_dict)
         for k in pnl.keys():
-
-            def renamer(s):
-                return s.replace("residential ", "").replace("services ", "")
-
-            pnl[k] = pnl[k].T.groupby(renamer).agg(agg[k], numeric_only=False).T
+            pnl[k] = aggregate_heat_columns(pnl[k], agg[k])
 
         # remove unclustered assets of service/residential
         to_drop = c.df.index.difference(df.index)
@@ -4873,9 +5043,12 @@ def cluster_heat_buses(n):
         import_components_from_dataframe(n, df.loc[to_add], c.name)
 
 
-def set_temporal_aggregation(n, resolution, snapshot_weightings):
+def set_temporal_aggregation(n, resolution, snapshot_weightings, inplace=False):
     """
     Aggregate time-varying data to the given snapshots.
+
+    With ``inplace=True`` the snapshots of ``n`` are replaced directly
+    instead of copying the static component data to a new network.
     """
     if not resolution:
         logger.info("No temporal aggregation. Using native resolution.")
@@ -4897,60 +5070,87 @@ def set_temporal_aggregation(n, resolution, snapshot_weightings):
         # Define a series used for aggregation, mapping each hour in
         # n.snapshots to the closest previous timestep in
         # snapshot_weightings.index
-        aggregation_map = (
-            pd.Series(
-                snapshot_weightings.index.get_indexer(n.snapshots), index=n.snapshots
+        indexer = snapshot_weightings.index.get_indexer(n.snapshots)
+        if len(indexer) and indexer[0] < 0:
+            raise ValueError(
+                f"First snapshot {n.snapshots[0]} is not a timestep in the "
+                "given snapshot weightings."
             )
-            .replace(-1, np.nan)
-            .ffill()
-            .astype(int)
-            .map(lambda i: snapshot_weightings.index[i])
+        # forward-fill the positions of hours that are not themselves a timestep
+        positions = np.where(indexer >= 0, np.arange(len(indexer)), 0)
+        np.maximum.accumulate(positions, out=positions)
+        aggregation_map = pd.Series(
+            snapshot_weightings.index[indexer[positions]], index=n.snapshots
         )
 
-        m = n.copy(with_time=False)
-        m.set_snapshots(snapshot_weightings.index)
-        m.snapshot_weightings = snapshot_weightings
-
-        # Aggregation all time-varying data.
+        # Aggregation all time-varying data, before the snapshots are replaced.
+        aggregated = {}
         for c in n.iterate_components():
-            pnl = getattr(m, c.list_name + "_t")
             for k, df in c.pnl.items():
                 if not df.empty:
                     if c.list_name == "stores" and k == "e_max_pu":
-                        pnl[k] = df.groupby(aggregation_map).min()
+                        aggregated[c.list_name, k] = df.groupby(aggregation_map).min()
                     elif c.list_name == "stores" and k == "e_min_pu":
-                        pnl[k] = df.groupby(aggregation_map).max()
+                        aggregated[c.list_name, k] = df.groupby(aggregation_map).max()
                     else:
-                        pnl[k] = df.groupby(aggregation_map).mean()
+                        aggregated[c.list_name, k] = df.groupby(aggregation_map).mean()
+
+        m = n if inplace else n.copy(with_time=False)
+        m.set_snapshots(snapshot_weightings.index)
+        m.snapshot_weightings = snapshot_weightings
+
+        for (list_name, k), df in aggregated.items():
+            getattr(m, list_name + "_t")[k] = df
 
         return m
 
 
-def lossy_bidirectional_links(n, carrier, efficiencies={}):
-    "Split bidirectional links into two unidirectional links to include transmission losses."
+def lossy_bidirectional_links(n, transmission_efficiency):
+    """
+    Split bidirectional links into two unidirectional links to include
+    transmission losses.
 
-    carrier_i = n.links.query("carrier == @carrier").index
+    The links of all carriers in ``transmission_efficiency`` (a mapping
+    of carrier to its loss parameters) are handled in a single pass.
+    """
 
-    if (
-        not any((v != 1.0) or (v >= 0) for v in efficiencies.values())
-        or carrier_i.empty
-    ):
+    losses = {}
+    for carrier, efficiencies in transmission_efficiency.items():
+        if not any((v != 1.0) or (v >= 0) for v in efficiencies.values()):
+            continue
+        losses[carrier] = {
+            "efficiency_static": efficiencies.get("efficiency_static", 1),
+            "efficiency_per_1000km": efficiencies.get("efficiency_per_1000km", 1),
+            "compression_per_1000km": efficiencies.get("compression_per_1000km", 0),
+        }
+
+    mask = n.links.carrier.isin(losses.keys()).to_numpy()
+    if not mask.any():
         return
 
-    efficiency_static = efficiencies.get("efficiency_static", 1)
-    efficiency_per_1000km = efficiencies.get("efficiency_per_1000km", 1)
-    compression_per_1000km = efficiencies.get("compression_per_1000km", 0)
-
-    logger.info(
-        f"Specified losses for {carrier} transmission "
-        f"(static: {efficiency_static}, per 1000km: {efficiency_per_1000km}, compression per 1000km: {compression_per_1000km}). "
-        "Splitting bidirectional links."
-    )
+    carrier_i = n.links.index[mask]
+    link_carriers = n.links.carrier[carrier_i]
 
-    n.links.loc[carrier_i, "p_min_pu"] = 0
-    n.links.loc[carrier_i, "efficiency"] = (
-        efficiency_static
-        * efficiency_per_1000km ** (n.links.loc[carrier_i, "length"] / 1e3)
+    for carrier in link_carriers.unique():
+        logger.info(
+            f"Specified losses for {carrier} transmission "
+            f"(static: {losses[carrier]['efficiency_static']}, per 1000km: {losses[carrier]['efficiency_per_1000km']}, compression per 1000km: {losses[carrier]['compression_per_1000km']}). "
+            "Splitting bidirectional links."
+        )
+
+    # loss parameters aligned with the affected links
+    link_losses = pd.DataFrame.from_dict(losses, orient="index").loc[link_carriers]
+    efficiency_static = link_losses["efficiency_static"].to_numpy()
+    efficiency_per_1000km = link_losses["efficiency_per_1000km"].to_numpy()
+    compression_per_1000km = link_losses["compression_per_1000km"].to_numpy()
+
+    # numeric columns are written by position from plain arrays, which skips
+    # the label lookup and index alignment of .loc assignments
+    row_pos = np.flatnonzero(mask)
+    length = n.links["length"].to_numpy()[row_pos]
+    n.links.iloc[row_pos, n.links.columns.get_loc("p_min_pu")] = 0
+    n.links.iloc[row_pos, n.links.columns.get_loc("efficiency")] = (
+        efficiency_static * efficiency_per_1000km ** (length / 1e3)
     )
     rev_links = (
         n.links.loc[carrier_i].copy().rename({"bus0": "bus1", "bus1": "bus0"}, axis=1)
@@ -4961,18 +5161,22 @@ def lossy_bidirectional_links(n, carrier, efficiencies={}):
     rev_links["reversed"] = True
     rev_links.index = rev_links.index.map(lambda x: x + "-reversed")
 
-    n.links = pd.concat([n.links, rev_links], sort=False)
+    n.madd("Link", rev_links.index, **rev_links)
+    # the original links have no values for the added columns
     n.links["reversed"] = n.links["reversed"].fillna(False).infer_objects(copy=False)
     n.links["length_original"] = n.links["length_original"].fillna(n.links.length)
 
     # do compression losses after concatenation to take electricity consumption at bus0 in either direction
-    carrier_i = n.links.query("carrier == @carrier").index
-    if compression_per_1000km > 0:
-        n.links.loc[carrier_i, "bus2"] = n.links.loc[carrier_i, "bus0"].map(
+    compressed = compression_per_1000km > 0
+    if compressed.any():
+        compressed_i = carrier_i[compressed].append(rev_links.index[compressed])
+        compression = np.tile(compression_per_1000km[compressed], 2)
+        n.links.loc[compressed_i, "bus2"] = n.links.loc[compressed_i, "bus0"].map(
             n.buses.location
         )  # electricity
-        n.links.loc[carrier_i, "efficiency2"] = (
-            -compression_per_1000km * n.links.loc[carrier_i, "length_original"] / 1e3
+        # label-based, so that the column is created if no link defines it yet
+        n.links.loc[compressed_i, "efficiency2"] = (
+            -compression * n.links.loc[compressed_i, "length_original"].to_numpy() / 1e3
         )
 
 
@@ -4980,7 +5184,8 @@ def add_enhanced_geothermal(n, egs_potentials, egs_overlap, costs):
     """
     Adds EGS potential to model.
 
-    Built in scripts/build_egs_potentials.py
+    Built in scripts/build_egs_potentials.py; ``egs_potentials`` and
+    ``egs_overlap`` are the parsed tables from that script.
     """
 
     if len(spatial.geothermal_heat.nodes) > 1:
@@ -5004,9 +5209,7 @@ def add_enhanced_geothermal(n, egs_potentials, egs_overlap, costs):
     costs_config = snakemake.config["costs"]
 
     # matrix defining the overlap between gridded geothermal potential estimation, and bus regions
-    overlap = pd.read_csv(egs_overlap, index_col=0)
-    overlap.columns = overlap.columns.astype(int)
-    egs_potentials = pd.read_csv(egs_potentials, index_col=0)
+    overlap = egs_overlap.set_axis(egs_overlap.columns.astype(int), axis=1)
 
     Nyears = n.snapshot_weightings.generators.sum() / 8760
     dr = costs_config["fill_values"]["discount rate"]
@@ -5023,10 +5226,12 @@ def add_enhanced_geothermal(n, egs_potentials, egs_overlap, costs):
     # The orc cost are attributed to a separate link representing the ORC.
     # also capital_cost conversion Euro/kW -> Euro/MW
 
-    egs_potentials["capital_cost"] = (
-        (egs_annuity + FOM / (1.0 + FOM))
-        * (egs_potentials["CAPEX"] * 1e3 - orc_capex)
-        * Nyears
+    fom_share = FOM / (1.0 + FOM)
+
+    # scalar factors are combined first so that only two elementwise
+    # operations are applied to the potentials
+    egs_potentials["capital_cost"] = ((egs_annuity + fom_share) * Nyears) * (
+        egs_potentials["CAPEX"] * 1e3 - orc_capex
     )
 
     assert (
@@ -5034,7 +5239,7 @@ def add_enhanced_geothermal(n, egs_potentials, egs_overlap, costs):
     ).all(), "Error in EGS cost, negative values found."
 
     orc_annuity = calculate_annuity(costs.at["organic rankine cycle", "lifetime"], dr)
-    orc_capital_cost = (orc_annuity + FOM / (1 + FOM)) * orc_capex * Nyears
+    orc_capital_cost = (orc_annuity + fom_share) * orc_capex * Nyears
 
     efficiency_orc = costs.at["organic rankine cycle", "efficiency"]
     efficiency_dh = costs.at["geothermal", "district heat-input"]
@@ -5077,6 +5282,9 @@ def add_enhanced_geothermal(n, egs_potentials, egs_overlap, costs):
     else:
         logger.info("Adding EGS for Electricity Only.")
 
+    egs_buses = []
+    wells = []
+
     for bus, bus_overlap in overlap.iterrows():
         if not bus_overlap.sum():
             continue
@@ -5091,93 +5299,104 @@ def add_enhanced_geothermal(n, egs_potentials, egs_overlap, costs):
         bus_egs = bus_egs.loc[bus_egs.p_nom_max > 0.0]
 
         appendix = " " + pd.Index(np.arange(len(bus_egs)).astype(str))
+        well_name = f"{bus} enhanced geothermal" + appendix
 
-        # add surface bus
-        n.madd(
-            "Bus",
-            pd.Index([f"{bus} geothermal heat surface"]),
-            location=bus,
-            unit="MWh_th",
-            carrier="geothermal heat",
+        egs_buses.append(bus)
+        wells.append(
+            pd.DataFrame(
+                {
+                    "bus": bus,
+                    "bus1": f"{bus} geothermal heat surface",
+                    "p_nom_max": bus_egs["p_nom_max"].to_numpy(),
+                    "capital_cost": bus_egs["capital_cost"].to_numpy(),
+                },
+                index=well_name,
+            )
         )
 
-        bus_egs.index = np.arange(len(bus_egs)).astype(str)
-        well_name = f"{bus} enhanced geothermal" + appendix
+    if not egs_buses:
+        return
 
-        if egs_config["var_cf"]:
-            bus_eta = pd.concat(
-                (efficiency[bus].rename(idx) for idx in well_name),
-                axis=1,
-            )
-        else:
-            bus_eta = efficiency
+    wells = pd.concat(wells)
 
-        p_nom_max = bus_egs["p_nom_max"]
-        capital_cost = bus_egs["capital_cost"]
-        bus1 = pd.Series(f"{bus} geothermal heat surface", well_name)
+    if egs_config["var_cf"]:
+        # every well takes the capacity factors of its bus region
+        efficiency = efficiency[wells["bus"]].set_axis(wells.index, axis=1)
+
+    egs_buses = pd.Index(egs_buses)
+    surface_buses = egs_buses + " geothermal heat surface"
+
+    # add surface buses and the geothermal wells of all buses in one go
+    n.madd(
+        "Bus",
+        surface_buses,
+        location=egs_buses,
+        unit="MWh_th",
+        carrier="geothermal heat",
+    )
+
+    # adding geothermal wells as multiple generators to represent supply curve
+    n.madd(
+        "Link",
+        wells.index,
+        bus0=spatial.geothermal_heat.nodes,
+        bus1=wells["bus1"],
+        carrier="geothermal heat",
+        p_nom_extendable=True,
+        p_nom_max=wells["p_nom_max"] / efficiency_orc,
+        capital_cost=wells["capital_cost"] * efficiency_orc,
+        efficiency=efficiency,
+    )
 
-        # adding geothermal wells as multiple generators to represent supply curve
+    # adding Organic Rankine Cycle as a single link per bus
+    n.madd(
+        "Link",
+        egs_buses,
+        suffix=" geothermal organic rankine cycle",
+        bus0=surface_buses,
+        bus1=egs_buses,
+        p_nom_extendable=True,
+        carrier="geothermal organic rankine cycle",
+        capital_cost=orc_capital_cost * efficiency_orc,
+        efficiency=efficiency_orc,
+    )
+
+    if as_chp:
+        dh_buses = egs_buses[(egs_buses + " urban central heat").isin(n.buses.index)]
         n.madd(
             "Link",
-            well_name,
-            bus0=spatial.geothermal_heat.nodes,
-            bus1=bus1,
-            carrier="geothermal heat",
+            dh_buses,
+            suffix=" geothermal heat district heat",
+            bus0=dh_buses + " geothermal heat surface",
+            bus1=dh_buses + " urban central heat",
+            carrier="geothermal district heat",
+            capital_cost=orc_capital_cost
+            * efficiency_orc
+            * costs.at["geothermal", "district heat surcharge"]
+            / 100.0,
+            efficiency=efficiency_dh,
             p_nom_extendable=True,
-            p_nom_max=p_nom_max.set_axis(well_name) / efficiency_orc,
-            capital_cost=capital_cost.set_axis(well_name) * efficiency_orc,
-            efficiency=bus_eta,
         )
 
-        # adding Organic Rankine Cycle as a single link
-        n.add(
-            "Link",
-            bus + " geothermal organic rankine cycle",
-            bus0=f"{bus} geothermal heat surface",
-            bus1=bus,
-            p_nom_extendable=True,
-            carrier="geothermal organic rankine cycle",
-            capital_cost=orc_capital_cost * efficiency_orc,
-            efficiency=efficiency_orc,
-        )
+    if egs_config["flexible"]:
+        # this StorageUnit represents flexible operation using the geothermal reservoir.
+        # Hence, it is counter-intuitive to install it at the surface bus,
+        # this is however the more lean and computationally efficient solution.
 
-        if as_chp and bus + " urban central heat" in n.buses.index:
-            n.add(
-                "Link",
-                bus + " geothermal heat district heat",
-                bus0=f"{bus} geothermal heat surface",
-                bus1=bus + " urban central heat",
-                carrier="geothermal district heat",
-                capital_cost=orc_capital_cost
-                * efficiency_orc
-                * costs.at["geothermal", "district heat surcharge"]
-                / 100.0,
-                efficiency=efficiency_dh,
-                p_nom_extendable=True,
-            )
-        elif as_chp and not bus + " urban central heat" in n.buses.index:
-            n.links.at[bus + " geothermal organic rankine cycle", "efficiency"] = (
-                efficiency_orc
-            )
+        max_hours = egs_config["max_hours"]
+        boost = egs_config["max_boost"]
 
-        if egs_config["flexible"]:
-            # this StorageUnit represents flexible operation using the geothermal reservoir.
-            # Hence, it is counter-intuitive to install it at the surface bus,
-            # this is however the more lean and computationally efficient solution.
-
-            max_hours = egs_config["max_hours"]
-            boost = egs_config["max_boost"]
-
-            n.add(
-                "StorageUnit",
-                bus + " geothermal reservoir",
-                bus=f"{bus} geothermal heat surface",
-                carrier="geothermal heat",
-                p_nom_extendable=True,
-                p_min_pu=-boost,
-                max_hours=max_hours,
-                cyclic_state_of_charge=True,
-            )
+        n.madd(
+            "StorageUnit",
+            egs_buses,
+            suffix=" geothermal reservoir",
+            bus=surface_buses,
+            carrier="geothermal heat",
+            p_nom_extendable=True,
+            p_min_pu=-boost,
+            max_hours=max_hours,
+            cyclic_state_of_charge=True,
+        )
 
 
 # %%
@@ -5203,10 +5422,17 @@ if __name__ == "__main__":
     cf_industry = snakemake.params.industry
 
     investment_year = int(snakemake.wildcards.planning_horizons[-4:])
+    # run-level constants, derived once
+    myopic = snakemake.params.foresight in ["myopic", "perfect"]
+    first_year_myopic = myopic and (
+        snakemake.params.planning_horizons[0] == investment_year
+    )
 
     n = pypsa.Network(snakemake.input.network)
 
-    pop_layout = pd.read_csv(snakemake.input.clustered_pop_layout, index_col=0)
+    cache_dir = snakemake.params.fast_io_cache if options.get("fast_io") else None
+
+    pop_layout = read_csv_cached(snakemake.input.clustered_pop_layout, cache_dir)
     nhours = n.snapshot_weightings.generators.sum()
     nyears = nhours / 8760
 
@@ -5217,12 +5443,21 @@ if __name__ == "__main__":
     )
 
     pop_weighted_energy_totals = (
-        pd.read_csv(snakemake.input.pop_weighted_energy_totals, index_col=0) * nyears
+        read_csv_cached(snakemake.input.pop_weighted_energy_totals, cache_dir) * nyears
     )
     pop_weighted_heat_totals = (
-        pd.read_csv(snakemake.input.pop_weighted_heat_totals, index_col=0) * nyears
+        read_csv_cached(snakemake.input.pop_weighted_heat_totals, cache_dir) * nyears
+    )
+    # overwrite the shared columns with the heat totals, keeping existing
+    # values where the heat totals are missing (as DataFrame.update does)
+    heat_cols = pop_weighted_heat_totals.columns.intersection(
+        pop_weighted_energy_totals.columns
+    )
+    pop_weighted_energy_totals[heat_cols] = (
+        pop_weighted_heat_totals[heat_cols]
+        .reindex(pop_weighted_energy_totals.index)
+        .fillna(pop_weighted_energy_totals[heat_cols])
     )
-    pop_weighted_energy_totals.update(pop_weighted_heat_totals)
 
     landfall_lengths = {
         tech: settings["landfall_length"]
@@ -5233,16 +5468,23 @@ if __name__ == "__main__":
 
     fn = snakemake.input.heating_efficiencies
     year = int(snakemake.params["energy_totals_year"])
-    heating_efficiencies = pd.read_csv(fn, index_col=[1, 0]).loc[year]
+    # keep the rows of the energy totals year before setting the country index,
+    # rather than building a (year, country) MultiIndex for all years
+    heating_efficiencies = pd.read_csv(fn)
+    country_col, year_col = heating_efficiencies.columns[:2]
+    heating_efficiencies = (
+        heating_efficiencies.loc[heating_efficiencies[year_col].to_numpy() == year]
+        .drop(columns=year_col)
+        .set_index(country_col)
+    )
 
     spatial = define_spatial(pop_layout.index, options)
 
-    if snakemake.params.foresight in ["myopic", "perfect"]:
+    if myopic:
         add_lifetime_wind_solar(n, costs)
 
         conventional = snakemake.params.conventional_carriers
-        for carrier in conventional:
-            add_carrier_buses(n, carrier)
+        add_carrier_buses(n, conventional)
 
     add_eu_bus(n)
 
@@ -5261,7 +5503,9 @@ if __name__ == "__main__":
         add_land_transport(n, costs)
 
     if options["heating"]:
-        add_heat(n=n, costs=costs, cop=xr.open_dataarray(snakemake.input.cop_profiles))
+        # the profiles are read from disk only for the selections made in add_heat
+        with xr.open_dataarray(snakemake.input.cop_profiles) as cop:
+            add_heat(n=n, costs=costs, cop=cop)
 
     if options["biomass"]:
         add_biomass(n, costs)
@@ -5300,24 +5544,37 @@ if __name__ == "__main__":
         add_green_imports(n, costs)
 
     n = set_temporal_aggregation(
-        n, snakemake.params.time_resolution, snakemake.input.snapshot_weightings
+        n,
+        snakemake.params.time_resolution,
+        snakemake.input.snapshot_weightings,
+        inplace=True,
     )
 
     co2_budget = snakemake.params.co2_budget
     if isinstance(co2_budget, str) and co2_budget.startswith("cb"):
+        emissions_scope = snakemake.params.emissions_scope
+        input_co2 = snakemake.input.co2
         fn = "results/" + snakemake.params.RDIR + "/csvs/carbon_budget_distribution.csv"
-        if not os.path.exists(fn):
-            emissions_scope = snakemake.params.emissions_scope
-            input_co2 = snakemake.input.co2
-            build_carbon_budget(
+        key = carbon_budget_key(
+            co2_budget,
+            emissions_scope,
+            snakemake.params.countries,
+            snakemake.params.planning_horizons,
+            options,
+            [snakemake.input.eurostat, input_co2],
+        )
+        # rebuild if the csv is missing or was built with other settings
+        co2_cap = read_carbon_budget(fn, key)
+        if co2_cap is None:
+            co2_cap = build_carbon_budget(
                 co2_budget,
                 snakemake.input.eurostat,
                 fn,
                 emissions_scope,
                 input_co2,
                 options,
+                key,
             )
-        co2_cap = pd.read_csv(fn, index_col=0).squeeze()
         limit = co2_cap.loc[investment_year]
     else:
         limit = get(co2_budget, investment_year)
@@ -5332,9 +5589,9 @@ if __name__ == "__main__":
 
     if options["enhanced_geothermal"].get("enable", False):
         logger.info("Adding Enhanced Geothermal Systems (EGS).")
-        add_enhanced_geothermal(
-            n, snakemake.input["egs_potentials"], snakemake.input["egs_overlap"], costs
-        )
+        egs_potentials = read_csv_cached(snakemake.input["egs_potentials"], cache_dir)
+        egs_overlap = read_csv_cached(snakemake.input["egs_overlap"], cache_dir)
+        add_enhanced_geothermal(n, egs_potentials, egs_overlap, costs)
 
     if options["gas_distribution_grid"]:
         insert_gas_distribution_costs(n, costs)
@@ -5343,22 +5600,17 @@ if __name__ == "__main__":
         add_electricity_grid_connection(n, costs)
 
     if options.get("transmission_efficiency_enabled", True):
-        for k, v in options["transmission_efficiency"].items():
-            lossy_bidirectional_links(n, k, v)
+        lossy_bidirectional_links(n, options["transmission_efficiency"])
 
     # Workaround: Remove lines with conflicting (and unrealistic) properties
     # cf. https://github.com/PyPSA/pypsa-eur/issues/444
     if snakemake.config["solving"]["options"]["transmission_losses"]:
-        idx = n.lines.query("num_parallel == 0").index
+        idx = n.lines.index[n.lines["num_parallel"].to_numpy() == 0]
         logger.info(
             f"Removing {len(idx)} line(s) with properties conflicting with transmission losses functionality."
         )
         n.mremove("Line", idx)
 
-    first_year_myopic = (snakemake.params.foresight in ["myopic", "perfect"]) and (
-        snakemake.params.planning_horizons[0] == investment_year
-    )
-
     if options.get("cluster_heat_buses", False) and not first_year_myopic:
         cluster_heat_buses(n)
 
@@ -5371,4 +5623,6 @@ if __name__ == "__main__":
     sanitize_carriers(n, snakemake.config)
     sanitize_locations(n)
 
-    n.export_to_netcdf(snakemake.output[0])
+    n.export_to_netcdf(
+        snakemake.output[0], compression=options.get("netcdf_compression")
+    )
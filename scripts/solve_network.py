@@ -32,6 +32,7 @@ import os
 import re
 import sys
 import time
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
@@ -44,17 +45,29 @@ from _helpers import (
     set_scenario_config,
     update_config_from_wildcards,
 )
+from linopy import merge
 from prepare_sector_network import get
 from pypsa.clustering.spatial import align_strategies, flatten_multiindex
 from pypsa.descriptors import Dict, get_activity_mask
 from pypsa.descriptors import get_switchable_as_dense as get_as_dense
 from pypsa.descriptors import nominal_attrs
-from pypsa.io import import_components_from_dataframe, import_series_from_dataframe
+from pypsa.io import import_components_from_dataframe
 
 logger = logging.getLogger(__name__)
 pypsa.pf.logger.setLevel(logging.WARNING)
 
 
+def carrier_contains(df, pattern):
+    """
+    Boolean mask of rows in `df` whose carrier contains `pattern`.
+
+    The substring test is run on the unique carriers only and then
+    broadcast with an ``isin`` lookup.
+    """
+    carriers = pd.Index(df.carrier.unique())
+    return df.carrier.isin(carriers[carriers.str.contains(pattern)])
+
+
 def add_land_use_constraint_perfect(n):
     """
     Add global constraints for tech capacity limit.
@@ -62,13 +75,22 @@ def add_land_use_constraint_perfect(n):
     logger.info("Add land-use constraint for perfect foresight")
 
     def compress_series(s):
-        def process_group(group):
-            if group.nunique() == 1:
-                return pd.Series(group.iloc[0], index=[None])
-            else:
-                return group
-
-        return s.groupby(level=[0, 1]).apply(process_group)
+        # collapse (carrier, bus) groups with a single value to one entry
+        # without build year, keep all other groups as they are
+        grouped = s.groupby(level=[0, 1])
+        nunique = grouped.nunique()
+        constant_i = nunique.index[nunique == 1]
+        constant = grouped.first().loc[constant_i]
+        constant.index = pd.MultiIndex.from_arrays(
+            [
+                constant_i.get_level_values(0),
+                constant_i.get_level_values(1),
+                [None] * len(constant_i),
+            ],
+            names=s.index.names,
+        )
+        varying = s[~s.index.droplevel(2).isin(constant_i)]
+        return pd.concat([constant, varying]).sort_index()
 
     def new_index_name(t):
         # Convert all elements to string and filter out None values
@@ -103,17 +125,14 @@ def add_land_use_constraint_perfect(n):
     # drop multi entries in case p_nom_max stays constant in different periods
     # p_nom_max = compress_series(p_nom_max)
     # adjust name to fit syntax of nominal constraint per bus
+    # groupby drops missing keys, so every row has a build year
     df = p_nom_max.reset_index()
-    df["name"] = df.apply(
-        lambda row: f"nom_max_{row['carrier']}"
-        + (f"_{row['build_year']}" if row["build_year"] is not None else ""),
-        axis=1,
+    df["name"] = (
+        "nom_max_" + df["carrier"].astype(str) + "_" + df["build_year"].astype(str)
     )
 
-    for name in df.name.unique():
-        df_carrier = df[df.name == name]
-        bus = df_carrier.bus
-        n.buses.loc[bus, name] = df_carrier.p_nom_max.values
+    for name, df_carrier in df.groupby("name", sort=False):
+        n.buses.loc[df_carrier.bus, name] = df_carrier.p_nom_max.values
 
     return n
 
@@ -121,7 +140,7 @@ def add_land_use_constraint_perfect(n):
 def add_land_use_constraint(n, current_horizon):
     # warning: this will miss existing offwind which is not classed AC-DC and has carrier 'offwind'
 
-    for carrier in [
+    carriers = [
         "solar",
         "solar rooftop",
         "solar-hsat",
@@ -129,16 +148,23 @@ def add_land_use_constraint(n, current_horizon):
         "offwind-ac",
         "offwind-dc",
         "offwind-float",
-    ]:
+    ]
 
-        ext_i = (n.generators.carrier == carrier) & ~n.generators.p_nom_extendable
-        existing = (
-            n.generators.loc[ext_i, "p_nom"]
-            .groupby(n.generators.bus.map(n.buses.location))
-            .sum()
-        )
-        existing.index += " " + carrier + "-" + current_horizon
-        n.generators.loc[existing.index, "p_nom_max"] -= existing
+    gens = n.generators
+    fixed_i = gens.carrier.isin(carriers) & ~gens.p_nom_extendable
+    existing = (
+        gens.loc[fixed_i, "p_nom"]
+        .groupby([gens.carrier, gens.bus.map(n.buses.location)])
+        .sum()
+    )
+    existing.index = (
+        existing.index.get_level_values(1)
+        + " "
+        + existing.index.get_level_values(0)
+        + "-"
+        + current_horizon
+    )
+    n.generators.loc[existing.index, "p_nom_max"] -= existing
 
     # check if existing capacities are larger than technical potential
     existing_large = n.generators[
@@ -184,9 +210,14 @@ def add_solar_potential_constraints(n, config):
     if all_solar_ext.empty:
         return
 
-    land_use = pd.Series(1, index=all_solar.index, name="land_use_factor")
-    for carrier, factor in land_use_factors.items():
-        land_use.loc[all_solar.carrier == carrier] *= factor
+    land_use = (
+        all_solar.carrier.map(land_use_factors).fillna(1.0).rename("land_use_factor")
+    )
+    # plain array aligned with the extendable generators for the linopy term
+    land_use_ext = xr.DataArray(
+        land_use.loc[all_solar_ext.index].to_numpy(),
+        coords=[("Generator", all_solar_ext.index)],
+    )
 
     location = n.buses.index.to_series()
     ggrouper = all_solar.bus
@@ -196,7 +227,7 @@ def add_solar_potential_constraints(n, config):
     rename = {"Generator-ext": "Generator"}
     lhs = (
         n.model["Generator-p_nom"].rename(rename).loc[all_solar_ext.index]
-        * land_use.loc[all_solar_ext.index]
+        * land_use_ext
     ).groupby(ggrouper.loc[all_solar_ext.index]).sum() + (
         all_solar_non_ext.p_nom * land_use.loc[all_solar_non_ext.index]
     ).groupby(
@@ -241,7 +272,14 @@ def add_carbon_constraint(n, snapshots):
     glcs = n.global_constraints.query('type == "co2_atmosphere"')
     if glcs.empty:
         return
-    for name, glc in glcs.iterrows():
+
+    bus_carrier = n.stores.bus.map(n.buses.carrier)
+    non_cyclic = ~n.stores.e_cyclic.to_numpy(dtype=bool)
+    last = n.snapshot_weightings.reset_index().groupby("period").last()
+    last_i = last.set_index([last.index, last.timestep]).index
+
+    for glc in glcs.itertuples():
+        name = glc.Index
         carattr = glc.carrier_attribute
         emissions = n.carriers.query(f"{carattr} != 0")[carattr]
 
@@ -249,15 +287,15 @@ def add_carbon_constraint(n, snapshots):
             continue
 
         # stores
-        bus_carrier = n.stores.bus.map(n.buses.carrier)
-        stores = n.stores[bus_carrier.isin(emissions.index) & ~n.stores.e_cyclic]
-        if not stores.empty:
-            last = n.snapshot_weightings.reset_index().groupby("period").last()
-            last_i = last.set_index([last.index, last.timestep]).index
-            final_e = n.model["Store-e"].loc[last_i, stores.index]
-            time_valid = int(glc.loc["investment_period"])
-            time_i = pd.IndexSlice[time_valid, :]
-            lhs = final_e.loc[time_i, :] - final_e.shift(snapshot=1).loc[time_i, :]
+        stores_i = n.stores.index[
+            bus_carrier.isin(emissions.index).to_numpy() & non_cyclic
+        ]
+        if not stores_i.empty:
+            final_e = n.model["Store-e"].loc[last_i, stores_i]
+            # last_i holds one snapshot per period, so select by position
+            pos = [last.index.get_loc(int(glc.investment_period))]
+            previous_e = final_e.shift(snapshot=1)
+            lhs = final_e.isel(snapshot=pos) - previous_e.isel(snapshot=pos)
 
             rhs = glc.constant
             n.model.add_constraints(lhs <= rhs, name=f"GlobalConstraint-{name}")
@@ -267,7 +305,14 @@ def add_carbon_budget_constraint(n, snapshots):
     glcs = n.global_constraints.query('type == "Co2Budget"')
     if glcs.empty:
         return
-    for name, glc in glcs.iterrows():
+
+    bus_carrier = n.stores.bus.map(n.buses.carrier)
+    non_cyclic = ~n.stores.e_cyclic.to_numpy(dtype=bool)
+    last = n.snapshot_weightings.reset_index().groupby("period").last()
+    last_i = last.set_index([last.index, last.timestep]).index
+
+    for glc in glcs.itertuples():
+        name = glc.Index
         carattr = glc.carrier_attribute
         emissions = n.carriers.query(f"{carattr} != 0")[carattr]
 
@@ -275,16 +320,16 @@ def add_carbon_budget_constraint(n, snapshots):
             continue
 
         # stores
-        bus_carrier = n.stores.bus.map(n.buses.carrier)
-        stores = n.stores[bus_carrier.isin(emissions.index) & ~n.stores.e_cyclic]
-        if not stores.empty:
-            last = n.snapshot_weightings.reset_index().groupby("period").last()
-            last_i = last.set_index([last.index, last.timestep]).index
-            final_e = n.model["Store-e"].loc[last_i, stores.index]
-            time_valid = int(glc.loc["investment_period"])
-            time_i = pd.IndexSlice[time_valid, :]
+        stores_i = n.stores.index[
+            bus_carrier.isin(emissions.index).to_numpy() & non_cyclic
+        ]
+        if not stores_i.empty:
+            final_e = n.model["Store-e"].loc[last_i, stores_i]
+            time_valid = int(glc.investment_period)
+            # last_i holds one snapshot per period, so select by position
+            pos = [last.index.get_loc(time_valid)]
             weighting = n.investment_period_weightings.loc[time_valid, "years"]
-            lhs = final_e.loc[time_i, :] * weighting
+            lhs = final_e.isel(snapshot=pos) * weighting
 
             rhs = glc.constant
             n.model.add_constraints(lhs <= rhs, name=f"GlobalConstraint-{name}")
@@ -321,9 +366,9 @@ def add_retrofit_gas_boiler_constraint(n, snapshots):
     c = "Link"
     logger.info("Add constraint for retrofitting gas boilers to H2 boilers.")
     # existing gas boilers
-    mask = n.links.carrier.str.contains("gas boiler") & ~n.links.p_nom_extendable
+    mask = carrier_contains(n.links, "gas boiler") & ~n.links.p_nom_extendable
     gas_i = n.links[mask].index
-    mask = n.links.carrier.str.contains("retrofitted H2 boiler")
+    mask = carrier_contains(n.links, "retrofitted H2 boiler")
     h2_i = n.links[mask].index
 
     n.links.loc[gas_i, "p_nom_extendable"] = True
@@ -336,11 +381,21 @@ def add_retrofit_gas_boiler_constraint(n, snapshots):
         & ~n.loads_t.p_set.columns.str.contains("industry")
         & ~n.loads_t.p_set.columns.str.contains("agriculture")
     ]
-    profile = n.loads_t.p_set[cols].div(
-        n.loads_t.p_set[cols].groupby(level=0).max(), level=0
+    # normalise by the maximum per period, which are contiguous blocks of snapshots
+    values = n.loads_t.p_set[cols].to_numpy(dtype=float, na_value=0.0)
+    period = n.snapshots.get_level_values(0)
+    starts = np.flatnonzero(np.r_[True, period[1:] != period[:-1]])
+    peak = np.repeat(
+        np.maximum.reduceat(values, starts, axis=0),
+        np.diff(np.r_[starts, len(values)]),
+        axis=0,
     )
     # to deal if max value is zero
-    profile.fillna(0, inplace=True)
+    profile = pd.DataFrame(
+        np.divide(values, peak, out=np.zeros_like(values), where=peak != 0),
+        index=n.snapshots,
+        columns=cols,
+    )
     profile.rename(columns=n.loads.bus.to_dict(), inplace=True)
     profile = profile.reindex(columns=n.links.loc[gas_i, "bus1"])
     profile.columns = gas_i
@@ -369,6 +424,7 @@ def prepare_network(
     current_horizon=None,
 ):
     if "clip_p_max_pu" in solve_opts:
+        clip = solve_opts["clip_p_max_pu"]
         for df in (
             n.generators_t.p_max_pu,
             n.generators_t.p_min_pu,
@@ -376,7 +432,8 @@ def prepare_network(
             n.links_t.p_min_pu,
             n.storage_units_t.inflow,
         ):
-            df.where(df > solve_opts["clip_p_max_pu"], other=0.0, inplace=True)
+            if not df.empty:
+                df.where(df > clip, other=0.0, inplace=True)
 
     if load_shedding := solve_opts.get("load_shedding"):
         # intersect between macroeconomic and surveybased willingness to pay
@@ -388,46 +445,58 @@ def prepare_network(
             # TODO: do not scale via sign attribute (use Eur/MWh instead of Eur/kWh)
             load_shedding = 1e2  # Eur/kWh
 
-        n.madd(
-            "Generator",
-            buses_i,
-            " load",
-            bus=buses_i,
-            carrier="load",
-            sign=1e-3,  # Adjust sign to measure p and p_nom in kW instead of MW
-            marginal_cost=load_shedding,  # Eur/kWh
-            p_nom=1e9,  # kW
+        load_shedders = pd.DataFrame(
+            {
+                "bus": buses_i,
+                "carrier": "load",
+                "sign": 1e-3,  # Adjust sign to measure p and p_nom in kW instead of MW
+                "marginal_cost": load_shedding,  # Eur/kWh
+                "p_nom": 1e9,  # kW
+            },
+            index=buses_i + " load",
         )
+        import_components_from_dataframe(n, load_shedders, "Generator")
 
     if solve_opts.get("curtailment_mode"):
         n.add("Carrier", "curtailment", color="#fedfed", nice_name="Curtailment")
         n.generators_t.p_min_pu = n.generators_t.p_max_pu
         buses_i = n.buses.query("carrier == 'AC'").index
-        n.madd(
-            "Generator",
-            buses_i,
-            suffix=" curtailment",
-            bus=buses_i,
-            p_min_pu=-1,
-            p_max_pu=0,
-            marginal_cost=-0.1,
-            carrier="curtailment",
-            p_nom=1e6,
+        curtailers = pd.DataFrame(
+            {
+                "bus": buses_i,
+                "p_min_pu": -1.0,
+                "p_max_pu": 0.0,
+                "marginal_cost": -0.1,
+                "carrier": "curtailment",
+                "p_nom": 1e6,
+            },
+            index=buses_i + " curtailment",
         )
+        import_components_from_dataframe(n, curtailers, "Generator")
 
     if solve_opts.get("noisy_costs"):
-        for t in n.iterate_components():
+        # draw the noise for all components at once and slice it per component,
+        # consecutive draws from the global stream (seeded in __main__) give
+        # the same numbers as drawing per component
+        components = [t for t in n.iterate_components() if "marginal_cost" in t.df]
+        noise = np.random.random(sum(len(t.df) for t in components)) - 0.5
+        offset = 0
+        for t in components:
             # if 'capital_cost' in t.df:
             #    t.df['capital_cost'] += 1e1 + 2.*(np.random.random(len(t.df)) - 0.5)
-            if "marginal_cost" in t.df:
-                t.df["marginal_cost"] += 1e-2 + 2e-3 * (
-                    np.random.random(len(t.df)) - 0.5
-                )
-
-        for t in n.iterate_components(["Line", "Link"]):
+            size = len(t.df)
+            t.df["marginal_cost"] += 1e-2 + 2e-3 * noise[offset : offset + size]
+            offset += size
+
+        components = list(n.iterate_components(["Line", "Link"]))
+        noise = np.random.random(sum(len(t.df) for t in components)) - 0.5
+        offset = 0
+        for t in components:
+            size = len(t.df)
             t.df["capital_cost"] += (
-                1e-1 + 2e-2 * (np.random.random(len(t.df)) - 0.5)
+                1e-1 + 2e-2 * noise[offset : offset + size]
             ) * t.df["length"]
+            offset += size
 
     if solve_opts.get("nhours"):
         nhours = solve_opts["nhours"]
@@ -499,18 +568,19 @@ def add_CCL_constraints(n, config, current_horizon):
         if config["solving"]["agg_p_nom_limits"]["agg_offwind"]:
             gens_cst = gens_cst.replace(rename_offwind)
         rhs_cst = (
-            pd.concat(
-                [gens_cst.bus.map(n.buses.country), gens_cst[["carrier", "p_nom"]]],
-                axis=1,
+            gens_cst["p_nom"]
+            .groupby(
+                [
+                    gens_cst.bus.map(n.buses.country).rename("country"),
+                    gens_cst.carrier,
+                ]
             )
-            .groupby(["bus", "carrier"])
             .sum()
         )
-        rhs_cst.index = rhs_cst.index.rename({"bus": "country"})
         rhs_min = agg_p_nom_minmax["min"].dropna()
         idx_min = rhs_min.index.join(rhs_cst.index, how="left")
         rhs_min = rhs_min.reindex(idx_min).fillna(0)
-        rhs = (rhs_min - rhs_cst.reindex(idx_min).fillna(0).p_nom).dropna()
+        rhs = (rhs_min - rhs_cst.reindex(idx_min).fillna(0)).dropna()
         rhs[rhs < 0] = 0
         minimum = xr.DataArray(rhs).rename(dim_0="group")
     else:
@@ -526,7 +596,7 @@ def add_CCL_constraints(n, config, current_horizon):
         rhs_max = agg_p_nom_minmax["max"].dropna()
         idx_max = rhs_max.index.join(rhs_cst.index, how="left")
         rhs_max = rhs_max.reindex(idx_max).fillna(0)
-        rhs = (rhs_max - rhs_cst.reindex(idx_max).fillna(0).p_nom).dropna()
+        rhs = (rhs_max - rhs_cst.reindex(idx_max).fillna(0)).dropna()
         rhs[rhs < 0] = 0
         maximum = xr.DataArray(rhs).rename(dim_0="group")
     else:
@@ -573,13 +643,12 @@ def add_EQ_constraints(n, o, scaling=1e-1):
         ggrouper = n.generators.bus
         lgrouper = n.loads.bus
         sgrouper = n.storage_units.bus
-    load = (
-        n.snapshot_weightings.generators
-        @ n.loads_t.p_set.groupby(lgrouper, axis=1).sum()
-    )
+    # weight over snapshots first, then aggregate the per-component totals
+    load = (n.snapshot_weightings.generators @ n.loads_t.p_set).groupby(lgrouper).sum()
     inflow = (
-        n.snapshot_weightings.stores
-        @ n.storage_units_t.inflow.groupby(sgrouper, axis=1).sum()
+        (n.snapshot_weightings.stores @ n.storage_units_t.inflow)
+        .groupby(sgrouper)
+        .sum()
     )
     inflow = inflow.reindex(load.index).fillna(0.0)
     rhs = scaling * (level * load - inflow)
@@ -694,9 +763,11 @@ def add_green_imports_lim_constraint(n, config):
     if green_import_links.empty:
         return
 
+    link_p = n.model["Link-p"]
+
     # Total green fuel imports
     lhs = (
-        n.model["Link-p"].sel(Link=green_import_links).sum("Link")
+        link_p.sel(Link=green_import_links).sum("Link")
         * n.snapshot_weightings.generators
     ).sum()
 
@@ -704,10 +775,9 @@ def add_green_imports_lim_constraint(n, config):
     electrolysis = n.links.loc[n.links.carrier == "H2 Electrolysis"].index
 
     rhs = (
-        (
-            n.model["Link-p"].sel(Link=electrolysis)
-            * n.links.loc[electrolysis, "efficiency"]
-        ).sum("Link")
+        (link_p.sel(Link=electrolysis) * n.links.loc[electrolysis, "efficiency"]).sum(
+            "Link"
+        )
         * n.snapshot_weightings.generators
     ).sum()
 
@@ -747,7 +817,8 @@ def add_operational_reserve_margin(n, sns, config):
     summed_reserve = reserve.sum("Generator")
 
     # Share of extendable renewable capacities
-    ext_i = n.generators.query("p_nom_extendable").index
+    extendable = n.generators.p_nom_extendable.to_numpy(dtype=bool)
+    ext_i = n.generators.index[extendable]
     vres_i = n.generators_t.p_max_pu.columns
     if not ext_i.empty and not vres_i.empty:
         capacity_factor = n.generators_t.p_max_pu[vres_i.intersection(ext_i)]
@@ -761,7 +832,11 @@ def add_operational_reserve_margin(n, sns, config):
         ).sum("Generator")
 
     # Total demand per t
-    demand = get_as_dense(n, "Load", "p_set").sum(axis=1)
+    # (time-varying loads plus the static p_set of all other loads, without
+    # densifying the static loads over all snapshots)
+    varying_i = n.loads.index.intersection(n.loads_t.p_set.columns)
+    static_demand = n.loads.p_set.drop(varying_i).sum()
+    demand = n.loads_t.p_set[varying_i].sum(axis=1) + static_demand
 
     # VRES potential of non extendable generators
     capacity_factor = n.generators_t.p_max_pu[vres_i.difference(ext_i)]
@@ -775,11 +850,9 @@ def add_operational_reserve_margin(n, sns, config):
 
     # additional constraint that capacity is not exceeded
     gen_i = n.generators.index
-    ext_i = n.generators.query("p_nom_extendable").index
-    fix_i = n.generators.query("not p_nom_extendable").index
+    fix_i = gen_i[~extendable]
 
     dispatch = n.model["Generator-p"]
-    reserve = n.model["Generator-r"]
 
     capacity_variable = n.model["Generator-p_nom"].rename(
         {"Generator-ext": "Generator"}
@@ -788,7 +861,14 @@ def add_operational_reserve_margin(n, sns, config):
 
     p_max_pu = get_as_dense(n, "Generator", "p_max_pu")
 
-    lhs = dispatch + reserve - capacity_variable * xr.DataArray(p_max_pu[ext_i])
+    # merge all terms at once instead of chaining binary additions
+    lhs = merge(
+        [
+            dispatch.to_linexpr(),
+            reserve.to_linexpr(),
+            capacity_variable * xr.DataArray(-p_max_pu[ext_i]),
+        ]
+    )
 
     rhs = (p_max_pu[fix_i] * capacity_fixed).reindex(columns=gen_i, fill_value=0)
 
@@ -806,14 +886,17 @@ def add_battery_constraints(n):
     discharger_bool = n.links.index.str.contains("battery discharger")
     charger_bool = n.links.index.str.contains("battery charger")
 
-    dischargers_ext = n.links[discharger_bool].query("p_nom_extendable").index
-    chargers_ext = n.links[charger_bool].query("p_nom_extendable").index
+    extendable = n.links.p_nom_extendable.to_numpy(dtype=bool)
+    dischargers_ext = n.links.index[discharger_bool & extendable]
+    chargers_ext = n.links.index[charger_bool & extendable]
 
-    eff = n.links.efficiency[dischargers_ext].values
-    lhs = (
-        n.model["Link-p_nom"].loc[chargers_ext]
-        - n.model["Link-p_nom"].loc[dischargers_ext] * eff
+    # labelled like the discharger capacities so the product needs no alignment
+    eff = xr.DataArray(
+        n.links.efficiency[dischargers_ext].to_numpy(),
+        coords=[("Link-ext", dischargers_ext)],
     )
+    p_nom = n.model["Link-p_nom"]
+    lhs = p_nom.loc[chargers_ext] - p_nom.loc[dischargers_ext] * eff
 
     n.model.add_constraints(lhs == 0, name="Link-charger_ratio")
 
@@ -830,21 +913,15 @@ def add_lossy_bidirectional_link_constraints(n):
     ).index
 
     def get_backward_i(forward_i):
-        return pd.Index(
-            [
-                (
-                    re.sub(r"-(\d{4})$", r"-reversed-\1", s)
-                    if re.search(r"-\d{4}$", s)
-                    else s + "-reversed"
-                )
-                for s in forward_i
-            ]
-        )
+        has_year = forward_i.str.contains(r"-\d{4}$", regex=True)
+        with_year = forward_i.str.replace(r"-(\d{4})$", r"-reversed-\1", regex=True)
+        return with_year.where(has_year, forward_i + "-reversed")
 
     backward_i = get_backward_i(forward_i)
 
-    lhs = n.model["Link-p_nom"].loc[backward_i]
-    rhs = n.model["Link-p_nom"].loc[forward_i]
+    p_nom = n.model["Link-p_nom"]
+    lhs = p_nom.loc[backward_i]
+    rhs = p_nom.loc[forward_i]
 
     n.model.add_constraints(lhs == rhs, name="Link-bidirectional_sync")
 
@@ -907,21 +984,30 @@ def add_pipe_retrofit_constraint(n):
     """
     Add constraint for retrofitting existing CH4 pipelines to H2 pipelines.
     """
-    reversed = n.links.reversed if "reversed" in n.links.columns else False
-    gas_pipes_i = n.links.query(
-        "carrier == 'gas pipeline' and p_nom_extendable and ~@reversed"
-    ).index
-    h2_retrofitted_i = n.links.query(
-        "carrier == 'H2 pipeline retrofitted' and p_nom_extendable and ~@reversed"
-    ).index
+    # extendable forward links, compared on plain arrays
+    candidate = n.links.p_nom_extendable.to_numpy(dtype=bool)
+    if "reversed" in n.links.columns:
+        candidate &= ~n.links.reversed.fillna(0).to_numpy(dtype=bool)
+    carrier = n.links.carrier.to_numpy()
+    gas_pipes_i = n.links.index[candidate & (carrier == "gas pipeline")]
+    h2_retrofitted_i = n.links.index[candidate & (carrier == "H2 pipeline retrofitted")]
 
     if h2_retrofitted_i.empty or gas_pipes_i.empty:
         return
 
     p_nom = n.model["Link-p_nom"]
+    # positional selection on the extendable link dimension
+    ext_i = p_nom.indexes["Link-ext"]
+    gas_pos = ext_i.get_indexer(gas_pipes_i)
+    h2_pos = ext_i.get_indexer(h2_retrofitted_i)
+    # -1 marks pipes without capacity variable, isel would pick the last link
+    assert (gas_pos >= 0).all(), "gas pipeline without Link-p_nom variable"
+    assert (h2_pos >= 0).all(), "H2 pipeline without Link-p_nom variable"
+    gas_p_nom = p_nom.isel({"Link-ext": gas_pos})
+    h2_p_nom = p_nom.isel({"Link-ext": h2_pos})
 
     CH4_per_H2 = 1 / n.config["sector"]["H2_retrofit_capacity_per_CH4"]
-    lhs = p_nom.loc[gas_pipes_i] + CH4_per_H2 * p_nom.loc[h2_retrofitted_i]
+    lhs = gas_p_nom + CH4_per_H2 * h2_p_nom
     rhs = n.links.p_nom[gas_pipes_i].rename_axis("Link-ext")
 
     n.model.add_constraints(lhs == rhs, name="Link-pipe_retrofit")
@@ -932,10 +1018,10 @@ def add_flexible_egs_constraint(n):
     Upper bounds the charging capacity of the geothermal reservoir according to
     the well capacity.
     """
-    well_index = n.links.loc[n.links.carrier == "geothermal heat"].index
-    storage_index = n.storage_units.loc[
-        n.storage_units.carrier == "geothermal heat"
-    ].index
+    well_index = n.links.index[n.links.carrier.to_numpy() == "geothermal heat"]
+    storage_index = n.storage_units.index[
+        n.storage_units.carrier.to_numpy() == "geothermal heat"
+    ]
 
     p_nom_rhs = n.model["Link-p_nom"].loc[well_index]
     p_nom_lhs = n.model["StorageUnit-p_nom"].loc[storage_index]
@@ -951,7 +1037,13 @@ def add_co2_atmosphere_constraint(n, snapshots):
 
     if glcs.empty:
         return
-    for name, glc in glcs.iterrows():
+
+    bus_carrier = n.stores.bus.map(n.buses.carrier)
+    non_cyclic = ~n.stores.e_cyclic.to_numpy(dtype=bool)
+    last_i = snapshots[-1]
+
+    for glc in glcs.itertuples():
+        name = glc.Index
         carattr = glc.carrier_attribute
         emissions = n.carriers.query(f"{carattr} != 0")[carattr]
 
@@ -959,11 +1051,11 @@ def add_co2_atmosphere_constraint(n, snapshots):
             continue
 
         # stores
-        bus_carrier = n.stores.bus.map(n.buses.carrier)
-        stores = n.stores[bus_carrier.isin(emissions.index) & ~n.stores.e_cyclic]
-        if not stores.empty:
-            last_i = snapshots[-1]
-            lhs = n.model["Store-e"].loc[last_i, stores.index]
+        stores_i = n.stores.index[
+            bus_carrier.isin(emissions.index).to_numpy() & non_cyclic
+        ]
+        if not stores_i.empty:
+            lhs = n.model["Store-e"].loc[last_i, stores_i]
             rhs = glc.constant
 
             n.model.add_constraints(lhs <= rhs, name=f"GlobalConstraint-{name}")
@@ -980,11 +1072,12 @@ def extra_functionality(n, snapshots):
     """
     config = n.config
     constraints = config["solving"].get("constraints", {})
-    if constraints["BAU"] and n.generators.p_nom_extendable.any():
+    extendable_generators = n.generators.p_nom_extendable.any()
+    if constraints["BAU"] and extendable_generators:
         add_BAU_constraints(n, config)
-    if constraints["SAFE"] and n.generators.p_nom_extendable.any():
+    if constraints["SAFE"] and extendable_generators:
         add_SAFE_constraints(n, config)
-    if constraints["CCL"] and n.generators.p_nom_extendable.any():
+    if constraints["CCL"] and extendable_generators:
         add_CCL_constraints(n, config)
     if constraints["green_imports_lim"]:
         add_green_imports_lim_constraint(n, config)
@@ -1108,6 +1201,51 @@ vars_to_store = [
 ]
 
 
+@lru_cache(maxsize=None)
+def component_strategies(component, keys):
+    """
+    Aggregation strategies for the attributes `keys` (a tuple) of `component`.
+
+    Cached, since the same attribute sets recur whenever build years are
+    aggregated again in the same process.
+    """
+    return align_strategies(strategies, keys, component)
+
+
+def strip_build_year(index):
+    """
+    Remove a trailing "-YYYY" build year from the names in `index`.
+    """
+    has_year = (index.str[-5] == "-") & index.str[-4:].str.isdigit()
+    return index.where(~has_year, index.str[:-5])
+
+
+def aggregate_columns(data, grouper, strategy):
+    """
+    Aggregate the columns of `data` that share the same `grouper` value.
+
+    "sum" and "mean" on float data are computed on the underlying array,
+    without transposing `data`; other strategies use a groupby on the
+    transposed frame.
+    """
+    if strategy not in ["sum", "mean"] or not all(
+        np.issubdtype(dtype, np.floating) for dtype in data.dtypes
+    ):
+        return data.T.groupby(grouper).agg(strategy).T
+
+    codes, groups = pd.factorize(grouper, sort=True)
+    order = np.argsort(codes, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+    values = data.to_numpy()[:, order]
+    # skip NaNs like pandas does
+    valid = ~np.isnan(values)
+    result = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=1)
+    if strategy == "mean":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result /= np.add.reduceat(valid, starts, axis=1, dtype=int)
+    return pd.DataFrame(result, index=data.index, columns=groups.rename(grouper.name))
+
+
 def aggregate_build_years(n, exclude_carriers):
     """
     Aggregate components which are identical in all but build year.
@@ -1120,32 +1258,34 @@ def aggregate_build_years(n, exclude_carriers):
         if c.name == "Line":
             continue
         if ("build_year" in c.df.columns) and (c.df.build_year > 0).any():
-            indices[c.name] = c.df.index.copy()
-
             attr = nominal_attrs[c.name]
 
             # Define the aggregation map
             idx_to_agg = c.df.loc[~c.df.carrier.isin(exclude_carriers)].index
             idx_no_year = pd.Series(c.df.index.copy(), index=c.df.index)
-            idx_no_year.loc[idx_to_agg] = idx_to_agg.str.replace(
-                r"-[0-9]{4}$", "", regex=True
-            )
+            idx_no_year.loc[idx_to_agg] = strip_build_year(idx_to_agg)
+
+            # Nothing to aggregate if no two components differ only in
+            # build year; leave the component untouched
+            if idx_no_year.is_unique:
+                continue
+
+            indices[c.name] = c.df.index.copy()
 
             # For each component (row) in df with name ending in
             # "-YYYY", store the columns listed in `vars_to_store` to
             # be disaggregated again later.
-            to_store = []
-            for v in [s.replace("attr_nom", attr) for s in vars_to_store]:
-                if v not in c.df.columns:
-                    continue
-                for build_year in c.df.build_year.unique():
-                    if build_year == 0:
-                        continue
-                    mask = c.df.build_year == build_year
-                    col = c.df.loc[mask, v].copy()
-                    col.index = pd.Index(idx_no_year.loc[mask])
-                    col.name = f"{v}-{build_year}"
-                    to_store.append(col)
+            store_vars = [s.replace("attr_nom", attr) for s in vars_to_store]
+            store_vars = [v for v in store_vars if v in c.df.columns]
+            with_year = c.df.build_year != 0
+            stored = (
+                c.df.loc[with_year, store_vars]
+                .set_index(
+                    [idx_no_year[with_year].to_numpy(), c.df.build_year[with_year]]
+                )
+                .unstack()
+            )
+            stored.columns = [f"{v}-{year}" for v, year in stored.columns]
 
             # For components that are non-extendable, set
             # attr_{min,max} = attr; this is for the aggregated
@@ -1158,15 +1298,15 @@ def aggregate_build_years(n, exclude_carriers):
             c.df.loc[non_extendable, f"{attr}_max"] = c.df.loc[non_extendable, attr]
 
             # Aggregate
-            static_strategies = align_strategies(strategies, c.df.columns, c.name)
+            static_strategies = component_strategies(c.name, tuple(c.df.columns))
             df_aggregated = c.df.groupby(idx_no_year).agg(static_strategies)
 
             # Add the columns that are stored for disaggregation.
-            df_aggregated = pd.concat([df_aggregated] + to_store, axis=1)
+            df_aggregated = pd.concat([df_aggregated, stored], axis=1)
 
             # Aggregate time-varying data.
             pnl_aggregated = Dict()
-            dynamic_strategies = align_strategies(strategies, c.pnl, c.name)
+            dynamic_strategies = component_strategies(c.name, tuple(c.pnl))
             for attr, data in c.pnl.items():
                 if data.empty:
                     pnl_aggregated[attr] = data
@@ -1174,7 +1314,7 @@ def aggregate_build_years(n, exclude_carriers):
 
                 strategy = dynamic_strategies[attr]
                 col_agg_map = idx_no_year.loc[data.columns]
-                pnl_aggregated[attr] = data.T.groupby(col_agg_map).agg(strategy).T
+                pnl_aggregated[attr] = aggregate_columns(data, col_agg_map, strategy)
 
             setattr(n, n.components[c.name]["list_name"], df_aggregated)
             setattr(n, n.components[c.name]["list_name"] + "_t", pnl_aggregated)
@@ -1192,6 +1332,7 @@ def disaggregate_build_years(n, indices, planning_horizon):
     for c in n.iterate_components():
         if c.name in indices:
             attr = nominal_attrs[c.name]
+            status = n.components[c.name]["attrs"]["status"]
             old_idx = c.df.index.copy()
 
             # Find the indices of components to be disaggregated
@@ -1201,9 +1342,7 @@ def disaggregate_build_years(n, indices, planning_horizon):
             # create column to map to corresponding aggregated
             # component
             disagg_df = pd.DataFrame(index=idx_diff, columns=c.df.columns)
-            disagg_df["id_no_year"] = disagg_df.index.str.replace(
-                r"-[0-9]{4}$", "", regex=True
-            )
+            disagg_df["id_no_year"] = strip_build_year(disagg_df.index)
             agg_map = disagg_df["id_no_year"].copy()
 
             # Copy values from aggregated component to disaggregated
@@ -1212,19 +1351,18 @@ def disaggregate_build_years(n, indices, planning_horizon):
             # Set build year from index
             disagg_df.loc[:, "build_year"] = disagg_df.index.str[-4:].astype(int)
 
-            # Disaggregate specially stored values exactly
+            # Disaggregate specially stored values exactly, gathering
+            # (aggregated component, build year) pairs from the stored
+            # per-year columns at once
+            rows = c.df.index.get_indexer(disagg_df["id_no_year"])
+            build_years, year_pos = np.unique(
+                disagg_df.build_year.to_numpy(dtype=int), return_inverse=True
+            )
             for v in [s.replace("attr_nom", attr) for s in vars_to_store]:
                 if v not in c.df.columns:
                     continue
-                for build_year in disagg_df.build_year.unique():
-                    idx_build_year = disagg_df.build_year == build_year
-                    disagg_df.loc[
-                        idx_build_year,
-                        v,
-                    ] = c.df.loc[
-                        disagg_df.loc[idx_build_year, "id_no_year"],
-                        f"{v}-{build_year}",
-                    ].values
+                stored = c.df[[f"{v}-{year}" for year in build_years]].to_numpy()
+                disagg_df.loc[:, v] = stored[rows, year_pos]
 
             # Set p_nom_opt to p_nom. This should go for all non-extendable
             # disaggregated components. p_nom_opt for the last planning horizon
@@ -1240,12 +1378,19 @@ def disaggregate_build_years(n, indices, planning_horizon):
             disagg_df.loc[idx_last_horizon, f"{attr}_opt"] = c.df.loc[
                 disagg_df.loc[idx_last_horizon, "id_no_year"], f"{attr}_opt"
             ].values
-            years = c.df.columns.str.extract(rf"{attr}-(\d{{4}})$").dropna()[0]
-            prev_years = years[years.astype(int) < int(planning_horizon)]
+            # stored "<attr>-YYYY" columns of earlier build years
+            prev_cols = [
+                col
+                for col in c.df.columns
+                if col.startswith(f"{attr}-")
+                and len(col) == len(attr) + 5
+                and col[-4:].isdigit()
+                and int(col[-4:]) < int(planning_horizon)
+            ]
             disagg_df.loc[idx_last_horizon, f"{attr}_opt"] -= (
                 c.df.loc[
                     disagg_df.loc[idx_last_horizon, "id_no_year"],
-                    [f"{attr}-{p}" for p in prev_years.values],
+                    prev_cols,
                 ]
                 .sum(axis=1)
                 .values
@@ -1268,15 +1413,15 @@ def disaggregate_build_years(n, indices, planning_horizon):
 
                 # Set the new columns to the values of the old columns
                 mask = agg_map.index[agg_map.isin(c.pnl[v].columns)]
-                pnl = c.pnl[v].loc[:, agg_map[mask]]
-                pnl.columns = mask
-                import_series_from_dataframe(n, pnl, c.name, v)
+                # (the columns are all new, so they are appended directly)
+                pnl = c.pnl[v].loc[:, agg_map[mask]].set_axis(mask, axis=1)
+                c.pnl[v] = pd.concat([c.pnl[v], pnl], axis=1).rename_axis(
+                    columns=c.name
+                )
 
                 # Variables that are outputs and don't start with
                 # "mu_" need to be scaled by nominal capacity.
-                if (
-                    n.components[c.name]["attrs"].loc[v, "status"] == "Output"
-                ) and not (v.startswith("mu_")):
+                if (status.get(v) == "Output") and not (v.startswith("mu_")):
                     scaling_factors = (
                         (
                             disagg_df.loc[mask, attr]
@@ -1284,7 +1429,6 @@ def disaggregate_build_years(n, indices, planning_horizon):
                         )
                         .astype(float)
                         .fillna(0.0)
-                        .reindex(c.pnl[v].columns, fill_value=1.0)
                     )
                     # For extendable components, recompute the scaling
                     # factors using attr + "_opt"
@@ -1299,19 +1443,21 @@ def disaggregate_build_years(n, indices, planning_horizon):
                         .astype(float)
                         .fillna(0.0)
                     )
-                    c.pnl[v] = c.pnl[v].mul(scaling_factors, axis=1)
+                    # only the disaggregated columns change; scale them in place
+                    c.pnl[v][mask] = (
+                        c.pnl[v][mask].to_numpy() * scaling_factors.to_numpy()
+                    )
 
             # Drop all columns in df ending in "-YYYY" (the columns
             # used to track aggregated information that has now been
             # disaggregated).
-            cols_to_drop = n.df(c.name).columns[
-                n.df(c.name).columns.str.match(r".*-[0-9]{4}$")
-            ]
-            n.df(c.name).drop(cols_to_drop, axis=1, inplace=True)
+            df = n.df(c.name)
+            cols_to_drop = df.columns[df.columns.str.match(r".*-[0-9]{4}$")]
+            df.drop(cols_to_drop, axis=1, inplace=True)
 
             # Now remove the aggregated components from both static
             # and varying data.
-            n.df(c.name).drop(old_idx.difference(indices[c.name]), inplace=True)
+            df.drop(old_idx.difference(indices[c.name]), inplace=True)
             for _, data in c.pnl.items():
                 if data.empty:
                     continue